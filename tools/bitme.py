@@ -54,6 +54,9 @@ except ImportError:
 # BTOR2, Z3, and bitwuzla models
 
 import math
+import functools
+import bisect
+import time
 
 # supported BTOR2 keywords and operators
 
@@ -228,6 +231,8 @@ class Line(Z3, Bitwuzla):
         if self.nid is not None:
             assert self.nid not in Line.lines, f"nid {self.nid} already defined @ {self.line_no}"
             Line.lines[self.nid] = self
+            if Emitter.emitter is not None:
+                Emitter.emitter.new_line(self)
         type(self).count += 1
 
     def is_defined(nid):
@@ -324,6 +329,25 @@ class Array(Sort):
 
     number_of_variable_arrays = 0
     number_of_mapped_arrays = 0
+    number_of_sparse_arrays = 0
+    number_of_mapped_elements = 0
+
+    # mapped arrays accessed only at constant indexes have elements only at those indexes
+
+    sparse_indexes = {}
+    default_elements = {}
+
+    # per-array choice between array theory and mapping to bitvectors
+
+    ARRAY_POLICY = False
+    ARRAY_ACCESS_COST = 4 # estimated cost of array accesses in bitvector operations
+    ITERATIVE_READ_BOUND = 16 # maximum number of elements read iteratively
+    POLICY_SIZE_BOUND = 32 # array size in bits considered for mapping without -array
+    DERIVE_SIZE_BOUND = False # derive array size bound from declared arrays without -array
+
+    unmapped_arrays = set()
+    read_iteratively = {}
+    array_encodings = {}
 
     def __init__(self, nid, array_size_line, element_size_line, comment, line_no):
         super().__init__(nid, comment, line_no)
@@ -350,6 +374,158 @@ class Array(Sort):
     def is_mapped_array(self):
         return self.array_size_line.size <= Array.ARRAY_SIZE_BOUND
 
+    def is_mapped(array_line):
+        return array_line.sid_line.is_mapped_array() and array_line not in Array.unmapped_arrays
+
+    def is_read_iteratively(array_line):
+        return Array.read_iteratively.get(array_line, Read.READ_ARRAY_ITERATIVELY)
+
+    def get_mapped_indexes(array_line):
+        if array_line in Array.sparse_indexes:
+            return Array.sparse_indexes[array_line]
+        else:
+            return range(2**array_line.sid_line.array_size_line.size)
+
+    def get_default_element(array_line):
+        # value of all untouched elements of sparse arrays
+        assert array_line in Array.default_elements
+        return Array.default_elements[array_line]
+
+    def find_array_class(array_classes, array_line):
+        array_classes.setdefault(array_line, array_line)
+        while array_classes[array_line] is not array_line:
+            array_classes[array_line] = array_classes[array_classes[array_line]]
+            array_line = array_classes[array_line]
+        return array_line
+
+    def union_array_classes(array_classes, array_line1, array_line2):
+        array_classes[Array.find_array_class(array_classes, array_line1)] = \
+            Array.find_array_class(array_classes, array_line2)
+
+    def get_constant_index(index_line):
+        if isinstance(index_line, Constant):
+            return index_line.value
+        elif isinstance(index_line, State) and index_line.init_line is not None and index_line.next_line is not None:
+            if index_line.next_line.exp_line is index_line and isinstance(index_line.init_line.exp_line, Constant):
+                # initialized read-only bitvector state
+                return index_line.init_line.exp_line.value
+        return None
+
+    def new_mapped_array_elements():
+        # arrays connected by writes, ites, inits, and nexts share their accessed indexes
+        array_classes = {}
+        for line in Line.lines.values():
+            if isinstance(line, Expression) and isinstance(line.sid_line, Array) and line.sid_line.is_mapped_array():
+                Array.find_array_class(array_classes, line)
+                if isinstance(line, Write):
+                    Array.union_array_classes(array_classes, line, line.arg1_line)
+                elif isinstance(line, Ite):
+                    Array.union_array_classes(array_classes, line, line.arg2_line)
+                    Array.union_array_classes(array_classes, line, line.arg3_line)
+            elif isinstance(line, Transitional) and isinstance(line.sid_line, Array) and line.sid_line.is_mapped_array():
+                Array.union_array_classes(array_classes, line.state_line, line.exp_line)
+
+        constant_indexes = {}
+        number_of_reads = {}
+        number_of_writes = {}
+        number_of_symbolic_reads = {}
+        number_of_symbolic_writes = {}
+        for line in Line.lines.values():
+            if isinstance(line, Read) or isinstance(line, Write):
+                if line.arg1_line.sid_line.is_mapped_array():
+                    array_class = Array.find_array_class(array_classes, line.arg1_line)
+                    accesses = number_of_reads if isinstance(line, Read) else number_of_writes
+                    accesses[array_class] = accesses.get(array_class, 0) + 1
+                    index = Array.get_constant_index(line.arg2_line)
+                    if index is not None:
+                        constant_indexes.setdefault(array_class, set()).add(index)
+                    else:
+                        accesses = number_of_symbolic_reads if isinstance(line, Read) else number_of_symbolic_writes
+                        accesses[array_class] = accesses.get(array_class, 0) + 1
+
+        # untouched elements have the same value if all arrays are initialized by the same constant
+        initial_constants = {}
+        is_uninitialized = {}
+        for line in array_classes:
+            array_class = Array.find_array_class(array_classes, line)
+            if isinstance(line, Constant_Array):
+                initial_constants.setdefault(array_class, {})[line.constant_line.value] = line.constant_line
+            elif isinstance(line, Variable) and (isinstance(line, Input) or line.init_line is None):
+                is_uninitialized[array_class] = True
+
+        for line in array_classes:
+            array_class = Array.find_array_class(array_classes, line)
+            reads = number_of_reads.get(array_class, 0)
+            writes = number_of_writes.get(array_class, 0)
+            symbolic_reads = number_of_symbolic_reads.get(array_class, 0)
+            symbolic_writes = number_of_symbolic_writes.get(array_class, 0)
+            is_uniform = array_class not in is_uninitialized and len(initial_constants.get(array_class, {})) == 1
+            is_sparse = symbolic_writes == 0 and (symbolic_reads == 0 or is_uniform)
+            if is_sparse:
+                number_of_elements = len(constant_indexes.get(array_class, set()))
+            else:
+                number_of_elements = 2**line.sid_line.array_size_line.size
+            if Array.ARRAY_POLICY:
+                # elements plus ites over all elements for each symbolic access versus array theory
+                mapping_cost = number_of_elements * (1 + symbolic_reads + symbolic_writes) + reads + writes - symbolic_reads - symbolic_writes
+                is_mapped = mapping_cost <= Array.ARRAY_ACCESS_COST * (reads + writes)
+                # balanced ites for reads over many elements
+                Array.read_iteratively[line] = number_of_elements <= Array.ITERATIVE_READ_BOUND
+            else:
+                mapping_cost = None
+                is_mapped = True
+            if not is_mapped:
+                Array.unmapped_arrays.add(line)
+                if isinstance(line, Variable):
+                    Array.number_of_mapped_arrays -= 1
+                    if isinstance(line, State):
+                        line.new_state(None)
+                    else:
+                        line.new_input(None)
+            elif is_sparse:
+                Array.sparse_indexes[line] = sorted(constant_indexes.get(array_class, set()))
+                if is_uniform:
+                    Array.default_elements[line] = list(initial_constants[array_class].values())[0]
+                if isinstance(line, Variable):
+                    Array.number_of_sparse_arrays += 1
+            if isinstance(line, Variable):
+                if is_mapped:
+                    line.new_mapped_array_elements(Array.get_mapped_indexes(line))
+                if Array.ARRAY_POLICY:
+                    if not is_mapped:
+                        encoding = "array"
+                    else:
+                        encoding = f"{"sparse" if is_sparse else "dense"} {"iterative" if Array.read_iteratively[line] else "recursive"}"
+                    Array.array_encodings[line] = (f"{line.symbol}: {encoding}, "
+                        f"{reads} reads, {writes} writes ({symbolic_reads} and {symbolic_writes} symbolic), "
+                        f"{number_of_elements} elements, cost {mapping_cost} vs {Array.ARRAY_ACCESS_COST * (reads + writes)}")
+
+        for line in list(Line.lines.values()):
+            if isinstance(line, Transitional) and line.index is None and line.sid_line.is_mapped_array():
+                if Array.is_mapped(line.state_line):
+                    line.new_mapped_array_elements()
+                else:
+                    line.new_transition(Init.inits if isinstance(line, Init) else Next.nexts, None)
+
+        # keep elements next to their arrays
+        State.states = dict(sorted(State.states.items()))
+        Variable.inputs = dict(sorted(Variable.inputs.items()))
+        Init.inits = dict(sorted(Init.inits.items()))
+        Next.nexts = dict(sorted(Next.nexts.items()))
+
+    def derive_array_size_bound(lines):
+        # largest declared array size up to policy bound, prior to parsing any nids
+        bitvec_sizes = {}
+        array_sizes = [0]
+        for line in lines:
+            tokens = line.split(';')[0].split()
+            if len(tokens) > 3 and tokens[1] == Sort.keyword:
+                if tokens[2] == Bitvec.keyword:
+                    bitvec_sizes[tokens[0]] = int(tokens[3])
+                elif tokens[2] == Array.keyword:
+                    array_sizes.append(bitvec_sizes.get(tokens[3], 0))
+        return max(size for size in array_sizes if size <= Array.POLICY_SIZE_BOUND)
+
     def accommodate_array_indexes(nid):
         if Array.ARRAY_SIZE_BOUND == 0:
             return nid
@@ -370,14 +546,30 @@ class Array(Sort):
         return self.bitwuzla
 
 class BVDD:
+    LINEAR_EXPRESSIONS = False
+
+    DYNAMIC_REORDER = False
+    REORDER_GROWTH = 2
+    REORDER_MINIMUM = 64
+
+    # variable order, if not ordered by nid
+    order = {}
+
+    number_of_nodes_after_reordering = 0
+    number_of_reorderings = 0
+
     number_of_solutions = 0
     max_number_of_solutions = 0
     avg_number_of_solutions = 0
     total_number_of_solutions = 0
 
+    # lines shared by all expressions generated for value sets
+    shared_lines = {}
+
     def __init__(self, var_line):
         self.var_line = var_line
         self.inputs = {}
+        self.key = None
 
     def __str__(self):
         string = ""
@@ -395,6 +587,15 @@ class BVDD:
         # for sorting BVDDs when generating expressions for value sets
         return id(self) < id(bvdd)
 
+    def get_rank(var_line):
+        if var_line in BVDD.order:
+            return (0, BVDD.order[var_line])
+        else:
+            return (1, var_line.nid)
+
+    def precedes(var_line1, var_line2):
+        return BVDD.get_rank(var_line1) < BVDD.get_rank(var_line2)
+
     def number_of_inputs(bvdd):
         if BVDD.is_output(bvdd):
             return 1
@@ -436,6 +637,7 @@ class BVDD:
     def set_input(self, sid_line, input_value, inputs_or_output):
         assert input_value not in self.inputs
         self.inputs[input_value] = inputs_or_output
+        self.key = None
         if BVDD.is_output(inputs_or_output):
             assert sid_line.is_unsigned_value(inputs_or_output)
             BVDD.number_of_solutions += 1
@@ -475,13 +677,13 @@ class BVDD:
 
     def apply_binary(self, sid_line, op, bvdd):
         assert BVDD.is_inputs(bvdd)
-        if self.var_line > bvdd.var_line:
+        if BVDD.precedes(bvdd.var_line, self.var_line):
             inputs = BVDD(bvdd.var_line)
             for input_value in bvdd.inputs:
                 inputs.set_input(sid_line, input_value, BVDD.apply(sid_line, op, self, bvdd.inputs[input_value]))
         else:
             inputs = BVDD(self.var_line)
-            if self.var_line < bvdd.var_line:
+            if BVDD.precedes(self.var_line, bvdd.var_line):
                 for input_value in self.inputs:
                     inputs.set_input(sid_line, input_value, BVDD.apply(sid_line, op, self.inputs[input_value], bvdd))
             else:
@@ -515,11 +717,11 @@ class BVDD:
 
     def merge(self, sid_line, bvdd):
         assert BVDD.is_inputs(bvdd)
-        if self.var_line > bvdd.var_line:
+        if BVDD.precedes(bvdd.var_line, self.var_line):
             return bvdd.merge(sid_line, self)
         else:
             inputs = BVDD(self.var_line)
-            if self.var_line < bvdd.var_line:
+            if BVDD.precedes(self.var_line, bvdd.var_line):
                 for input_value in range(2**self.var_line.sid_line.size):
                     if input_value in self.inputs:
                         # assert: intersection of self and bvdd is empty
@@ -543,7 +745,159 @@ class BVDD:
                         inputs.set_input(sid_line, input_value, bvdd.inputs[input_value])
         return BVDD.reduce(inputs)
 
-    def get_expression(self, sid_line):
+    # variable ordering
+
+    def set_dependency_order(lines):
+        # order variables by first occurrence in depth-first traversal of lines
+        BVDD.order = {}
+        visited = set()
+        for line in lines:
+            stack = [line]
+            while stack:
+                line = stack.pop()
+                if line not in visited:
+                    visited.add(line)
+                    if isinstance(line, Variable):
+                        BVDD.order[line] = len(BVDD.order)
+                    # push operands in reverse order to visit them left to right
+                    for operand in ['exp_line', 'property_line', 'arg3_line', 'arg2_line', 'arg1_line']:
+                        if isinstance(getattr(line, operand, None), Line):
+                            stack.append(getattr(line, operand))
+
+    def get_nodes(bvdd, nodes):
+        if BVDD.is_inputs(bvdd) and id(bvdd) not in nodes:
+            nodes[id(bvdd)] = bvdd
+            for input_value in bvdd.inputs:
+                BVDD.get_nodes(bvdd.inputs[input_value], nodes)
+        return nodes
+
+    def get_variables(bvdd, variables):
+        if BVDD.is_inputs(bvdd):
+            variables[bvdd.var_line] = None
+            for input_value in bvdd.inputs:
+                BVDD.get_variables(bvdd.inputs[input_value], variables)
+        return variables
+
+    def insert(sid_line, var_line, input_value, bvdd):
+        # bvdd constrained to var_line == input_value in current variable order
+        if BVDD.is_output(bvdd) or BVDD.precedes(var_line, bvdd.var_line):
+            return BVDD(var_line).set_input(sid_line, input_value, bvdd)
+        else:
+            assert var_line is not bvdd.var_line
+            inputs = BVDD(bvdd.var_line)
+            for bvdd_input_value in bvdd.inputs:
+                inputs.set_input(sid_line, bvdd_input_value,
+                    BVDD.insert(sid_line, var_line, input_value, bvdd.inputs[bvdd_input_value]))
+            return inputs
+
+    def reorder(sid_line, bvdd, reordered):
+        # rebuild bvdd in current variable order
+        if BVDD.is_output(bvdd):
+            return bvdd
+        elif id(bvdd) not in reordered:
+            inputs = None
+            for input_value in bvdd.inputs:
+                # inputs for different input values are disjoint
+                input_inputs = BVDD.insert(sid_line, bvdd.var_line, input_value,
+                    BVDD.reorder(sid_line, bvdd.inputs[input_value], reordered))
+                inputs = input_inputs if inputs is None else inputs.merge(sid_line, input_inputs)
+            # keep bvdd to avoid reusing its id
+            reordered[id(bvdd)] = (bvdd, inputs)
+        return reordered[id(bvdd)][1]
+
+    def reorder_values(values_list):
+        reordered = {}
+        for values in values_list:
+            values.values = BVDD.reorder(values.sid_line, values.values, reordered)
+        return reordered
+
+    def get_number_of_nodes(values_list):
+        nodes = {}
+        for values in values_list:
+            BVDD.get_nodes(values.values, nodes)
+        return len(nodes)
+
+    def get_cached_values():
+        values_list = {}
+        for line in Line.lines.values():
+            caches = [getattr(line, 'cache_values', {})]
+            if isinstance(getattr(line, 'instance', None), Instance):
+                caches.append(line.instance.cache_instance)
+            for cache in caches:
+                for values in cache.values():
+                    if isinstance(values, Values) and BVDD.is_inputs(values.values):
+                        values_list[id(values)] = values
+        return list(values_list.values())
+
+    def reorder_dynamically(step, level):
+        # sifting variables triggered by growth of state values
+        state_values = [state.instance.cache_instance[step] for state in State.states.values()
+            if step in state.instance.cache_instance and isinstance(state.instance.cache_instance[step], Values)
+                and BVDD.is_inputs(state.instance.cache_instance[step].values)]
+        number_of_nodes = BVDD.get_number_of_nodes(state_values)
+        if number_of_nodes < max(BVDD.REORDER_MINIMUM,
+            BVDD.REORDER_GROWTH * BVDD.number_of_nodes_after_reordering):
+            return
+
+        # reordering preserves value sets and thus solution counts
+        number_of_solutions = BVDD.number_of_solutions
+
+        variables = {}
+        for values in state_values:
+            BVDD.get_variables(values.values, variables)
+        variables = sorted(variables, key=BVDD.get_rank)
+
+        # variables not in state values are ordered after variables in state values
+        other_variables = sorted(BVDD.order.keys() - set(variables), key=BVDD.get_rank)
+
+        original_values = [values.values for values in state_values]
+
+        for var_line in list(variables):
+            # move variable to position with fewest nodes
+            variables.remove(var_line)
+            best_position = None
+            for position in range(len(variables) + 1):
+                BVDD.order = {line: rank for rank, line
+                    in enumerate(variables[:position] + [var_line] + variables[position:] + other_variables)}
+                for values, original in zip(state_values, original_values):
+                    values.values = original
+                BVDD.reorder_values(state_values)
+                position_number_of_nodes = BVDD.get_number_of_nodes(state_values)
+                if best_position is None or position_number_of_nodes < number_of_nodes:
+                    best_position = position
+                    number_of_nodes = position_number_of_nodes
+            variables.insert(best_position, var_line)
+
+        BVDD.order = {line: rank for rank, line in enumerate(variables + other_variables)}
+
+        # rebuild all value sets, including state values, in final variable order
+        for values, original in zip(state_values, original_values):
+            values.values = original
+        BVDD.reorder_values(BVDD.get_cached_values())
+
+        BVDD.number_of_solutions = number_of_solutions
+        BVDD.number_of_nodes_after_reordering = BVDD.get_number_of_nodes(state_values)
+        BVDD.number_of_reorderings += 1
+
+        print_message(f"reordered {len(variables)} variables: {BVDD.number_of_nodes_after_reordering} nodes\n", step, level)
+
+    def get_key(bvdd):
+        # structurally equal BVDDs have equal keys
+        if BVDD.is_output(bvdd):
+            return int(bvdd)
+        else:
+            if bvdd.key is None:
+                bvdd.key = (bvdd.var_line.nid,
+                    tuple((input_value, BVDD.get_key(bvdd.inputs[input_value]))
+                        for input_value in sorted(bvdd.inputs)))
+            return bvdd.key
+
+    def get_shared_line(key, new_line):
+        if key not in BVDD.shared_lines:
+            BVDD.shared_lines[key] = new_line()
+        return BVDD.shared_lines[key]
+
+    def get_linear_expression(self, sid_line):
         exp_line = Zero(next_nid(), sid_line, "unreachable-value", "unreachable value", 0)
         # TODO: check if sorting (here by input value) is necessary for consistency
         for input_value in sorted(self.inputs):
@@ -558,9 +912,125 @@ class BVDD:
                 self.var_line.comment, self.var_line.line_no)
         return exp_line
 
+    def get_constant(self, size, value):
+        sid_line = BVDD.get_shared_line(('bitvec', size),
+            lambda: Bitvec(next_nid(), size, f"{size}-bit bitvector for testing value sets", 0))
+        return BVDD.get_shared_line(('constd', sid_line.nid, value),
+            lambda: Constd(next_nid(), sid_line, value, f"{value} for testing value sets", 0))
+
+    def get_low_bits(self, size):
+        # low bits of the variable select among inputs in aligned ranges of 2**size values
+        if size == self.var_line.sid_line.size:
+            return self.var_line
+        else:
+            return BVDD.get_shared_line(('slice', self.var_line.nid, size - 1, 0),
+                lambda: Slice(next_nid(), self.get_constant(size, 0).sid_line, self.var_line, size - 1, 0,
+                    self.var_line.comment, self.var_line.line_no))
+
+    def get_comparison(self, op, arg1_line, arg2_line):
+        return BVDD.get_shared_line((op, arg1_line.nid, arg2_line.nid),
+            lambda: Comparison(next_nid(), op, Bool.boolean, arg1_line, arg2_line,
+                self.var_line.comment, self.var_line.line_no))
+
+    def get_bit_test(self, bit):
+        return self.get_comparison(OP_EQ,
+            BVDD.get_shared_line(('slice', self.var_line.nid, bit, bit),
+                lambda: Slice(next_nid(), self.get_constant(1, 0).sid_line, self.var_line, bit, bit,
+                    self.var_line.comment, self.var_line.line_no)),
+            self.get_constant(1, 1))
+
+    def get_cube_test(self, size, input_values):
+        # test if low bits match the bits shared by all input values
+        all_ones = functools.reduce(lambda x, y: x & y, input_values)
+        any_ones = functools.reduce(lambda x, y: x | y, input_values)
+        varying_bits = all_ones ^ any_ones
+        if len(input_values) != 2**varying_bits.bit_count():
+            return None
+        mask = 2**size - 1 & ~varying_bits
+        low_bits_line = self.get_low_bits(size)
+        if mask != 2**size - 1:
+            low_bits_line = BVDD.get_shared_line((OP_AND, low_bits_line.nid, mask),
+                lambda: Logical(next_nid(), OP_AND, low_bits_line.sid_line,
+                    low_bits_line, self.get_constant(size, mask),
+                    self.var_line.comment, self.var_line.line_no))
+        return self.get_comparison(OP_EQ, low_bits_line, self.get_constant(size, all_ones & mask))
+
+    def get_interval_test(self, size, input_values):
+        # test if low bits are in the interval spanned by all input values
+        lower, upper = min(input_values), max(input_values)
+        if upper - lower + 1 != len(input_values):
+            return None
+        low_bits_line = self.get_low_bits(size)
+        if lower == 0:
+            return self.get_comparison(OP_ULTE, low_bits_line, self.get_constant(size, upper))
+        elif upper == 2**size - 1:
+            return self.get_comparison(OP_UGTE, low_bits_line, self.get_constant(size, lower))
+        else:
+            return None
+
+    def get_ite(self, sid_line, test_line, then_line, else_line):
+        return BVDD.get_shared_line((OP_ITE, test_line.nid, then_line.nid, else_line.nid),
+            lambda: Ite(next_nid(), sid_line, test_line, then_line, else_line,
+                self.var_line.comment, self.var_line.line_no))
+
+    def get_decision_tree(self, sid_line, keys, children, size, trees):
+        # trees only depend on keys since tests only involve low bits
+        if keys not in trees:
+            if len(set(keys)) == 1:
+                trees[keys] = children[keys[0]]
+            else:
+                test_line = None
+                if len(set(keys)) == 2:
+                    # group inputs that share the less frequent output
+                    key = min(set(keys), key=keys.count)
+                    input_values = [input_value for input_value in range(len(keys)) if keys[input_value] == key]
+                    test_line = self.get_cube_test(size, input_values)
+                    if test_line is None:
+                        test_line = self.get_interval_test(size, input_values)
+                    if test_line is not None:
+                        other_key = (set(keys) - {key}).pop()
+                        trees[keys] = self.get_ite(sid_line, test_line, children[key], children[other_key])
+                if test_line is None:
+                    # balanced decision on the most significant of the low bits
+                    half = len(keys) // 2
+                    trees[keys] = self.get_ite(sid_line, self.get_bit_test(size - 1),
+                        self.get_decision_tree(sid_line, keys[half:], children, size - 1, trees),
+                        self.get_decision_tree(sid_line, keys[:half], children, size - 1, trees))
+        return trees[keys]
+
+    def get_compact_expression(self, sid_line):
+        children = {}
+        for input_value in self.inputs:
+            key = BVDD.get_key(self.inputs[input_value])
+            if key not in children:
+                children[key] = BVDD.get_bvdd_expression(sid_line, self.inputs[input_value])
+        if 0 not in children:
+            # unreachable inputs evaluate to zero as in the linear encoding
+            children[0] = BVDD.get_bvdd_expression(sid_line, 0)
+        keys = tuple(BVDD.get_key(self.inputs[input_value]) if input_value in self.inputs else 0
+            for input_value in range(2**self.var_line.sid_line.size))
+        if isinstance(self.var_line.sid_line, Bool):
+            if keys[0] == keys[1]:
+                return children[keys[0]]
+            else:
+                return self.get_ite(sid_line, self.var_line, children[keys[1]], children[keys[0]])
+        return self.get_decision_tree(sid_line, keys, children, self.var_line.sid_line.size, {})
+
+    def get_expression(self, sid_line):
+        if BVDD.LINEAR_EXPRESSIONS:
+            return self.get_linear_expression(sid_line)
+        else:
+            # share expressions of structurally equal BVDDs
+            return BVDD.get_shared_line((sid_line.nid, BVDD.get_key(self)),
+                lambda: self.get_compact_expression(sid_line))
+
     def get_bvdd_expression(sid_line, bvdd):
         if BVDD.is_output(bvdd):
-            return Constd(next_nid(), sid_line, int(bvdd), "domain-propagated value", 0)
+            if BVDD.LINEAR_EXPRESSIONS:
+                return Constd(next_nid(), sid_line, int(bvdd), "domain-propagated value", 0)
+            else:
+                return BVDD.get_shared_line(('propagated', sid_line.nid, int(bvdd)),
+                    lambda: Constd(next_nid(), sid_line, int(bvdd), "domain-propagated value", 0))
         else:
             return bvdd.get_expression(sid_line)
 
@@ -611,7 +1081,7 @@ class Values:
         return self.get_false_constraint(), self.get_true_constraint()
 
     def get_expression(self):
-        # naive transition from domain propagation to bit blasting
+        # transition from domain propagation to bit blasting
         assert isinstance(self.sid_line, Bitvector)
         return BVDD.get_bvdd_expression(self.sid_line, self.values)
 
@@ -857,6 +1327,373 @@ class Values:
             values3 = values3.constrain(false_constraint)
             return values2.merge(values3)
 
+# ternary 0/1/X simulation
+
+class Ternary_Array:
+    # known elements and default element of array values,
+    # seeded arrays have random elements instead of default element
+
+    def __init__(self, default, elements = None, seed = None, element_size = None):
+        self.default = default
+        self.elements = {} if elements is None else elements
+        self.seed = seed
+        self.element_size = element_size
+
+    def __eq__(self, array):
+        return (isinstance(array, Ternary_Array) and self.default == array.default
+            and self.elements == array.elements and self.seed == array.seed)
+
+    def get_element(self, index):
+        if index in self.elements:
+            return self.elements[index]
+        elif self.seed is not None:
+            return Ternary_Simulation.known(hash((self.seed, index)), self.element_size)
+        else:
+            return self.default
+
+    def read(self, index, size):
+        if Ternary_Simulation.is_known(index, size):
+            return self.get_element(index[1])
+        else:
+            value = self.default
+            for element in self.elements.values():
+                value = Ternary_Simulation.join(value, element)
+            return value
+
+    def write(self, index, value, size):
+        if Ternary_Simulation.is_known(index, size) and (size <= Ternary_Simulation.ARRAY_SIZE_BOUND or self.seed is not None):
+            elements = dict(self.elements)
+            elements[index[1]] = value
+            return Ternary_Array(self.default, elements, self.seed, self.element_size)
+        else:
+            # elements of large arrays are not tracked individually
+            return Ternary_Array(Ternary_Simulation.join(self.default, value),
+                {i: Ternary_Simulation.join(element, value) for i, element in self.elements.items()})
+
+    def join(self, array):
+        return Ternary_Array(Ternary_Simulation.join(self.default, array.default),
+            {i: Ternary_Simulation.join(self.get_element(i), array.get_element(i))
+                for i in self.elements.keys() | array.elements.keys()},
+            self.seed if self.seed == array.seed else None, self.element_size)
+
+class Ternary_Simulation:
+    # ternary values are pairs of known-bits mask and bits,
+    # bits of state values are known for the first k steps or forever
+
+    STEPS = None # number of simulated steps, if any
+
+    ARRAY_SIZE_BOUND = 8 # track elements of arrays up to array size in bits
+
+    number_of_state_bits = 0
+    number_of_step_constant_bits = 0
+    number_of_invariant_bits = 0
+
+    def ones(size):
+        return 2**size - 1
+
+    def unknown():
+        return (0, 0)
+
+    def known(value, size):
+        return (Ternary_Simulation.ones(size), value % 2**size)
+
+    def is_known(value, size):
+        return value[0] == Ternary_Simulation.ones(size)
+
+    def is_true(value):
+        return value == (1, 1)
+
+    def is_false(value):
+        return value == (1, 0)
+
+    def join(value1, value2):
+        if isinstance(value1, Ternary_Array):
+            return value1.join(value2)
+        mask = value1[0] & value2[0] & ~(value1[1] ^ value2[1])
+        return (mask, value1[1] & mask)
+
+    def get_unsigned_bounds(value, size):
+        return value[1], value[1] | (Ternary_Simulation.ones(size) & ~value[0])
+
+    def get_arithmetic(value1, value2, size, function):
+        # low bits of sums, differences, and products only depend on low bits of operands
+        mask = value1[0] & value2[0]
+        known_low_bits = min((~mask & (mask + 1)).bit_length() - 1, size)
+        mask = Ternary_Simulation.ones(known_low_bits)
+        return (mask, function(value1[1], value2[1]) & mask)
+
+    def get_runs(mask, size):
+        # runs of known and unknown bits from most to least significant bit
+        runs = []
+        u = size - 1
+        while u >= 0:
+            is_known = (mask >> u) & 1
+            l = u
+            while l > 0 and (mask >> (l - 1)) & 1 == is_known:
+                l -= 1
+            runs.append((u, l, is_known))
+            u = l - 1
+        return runs
+
+    def get_z3_name(name, sid_line, value):
+        mask, bits = value
+        if mask == 0:
+            return name
+        elif isinstance(sid_line, Bool):
+            return z3.BoolVal(bool(bits))
+        parts = []
+        for u, l, is_known in Ternary_Simulation.get_runs(mask, sid_line.size):
+            if is_known:
+                parts.append(z3.BitVecVal((bits >> l) & Ternary_Simulation.ones(u - l + 1), u - l + 1))
+            else:
+                parts.append(z3.Extract(u, l, name))
+        return parts[0] if len(parts) == 1 else z3.Concat(*parts)
+
+    def get_bitwuzla_name(name, sid_line, value, tm):
+        mask, bits = value
+        if mask == 0:
+            return name
+        elif isinstance(sid_line, Bool):
+            return tm.mk_true() if bool(bits) else tm.mk_false()
+        parts = []
+        for u, l, is_known in Ternary_Simulation.get_runs(mask, sid_line.size):
+            if is_known:
+                parts.append(tm.mk_bv_value(tm.mk_bv_sort(u - l + 1),
+                    (bits >> l) & Ternary_Simulation.ones(u - l + 1)))
+            else:
+                parts.append(tm.mk_term(bitwuzla.Kind.BV_EXTRACT, [name], [u, l]))
+        return parts[0] if len(parts) == 1 else tm.mk_term(bitwuzla.Kind.BV_CONCAT, parts)
+
+    def get_initial_values(states):
+        cache = {}
+        values = {}
+        for state in states:
+            if state.init_line is not None:
+                value = state.init_line.exp_line.get_ternary({}, cache)
+                if isinstance(state.sid_line, Array) and not isinstance(value, Ternary_Array):
+                    value = Ternary_Array(value)
+                values[state] = value
+        return values
+
+    def get_next_values(states, values):
+        # uninitialized states are unknown in all steps
+        cache = {}
+        next_values = {}
+        for state in states:
+            if state in values:
+                if state.next_line is not None:
+                    next_values[state] = state.next_line.exp_line.get_ternary(values, cache)
+                else:
+                    next_values[state] = values[state]
+        return next_values
+
+    def simulate():
+        states = list(State.states.values())
+
+        step_values = [Ternary_Simulation.get_initial_values(states)]
+        for step in range(Ternary_Simulation.STEPS):
+            step_values.append(Ternary_Simulation.get_next_values(states, step_values[-1]))
+
+        # join all reachable values until fixpoint
+        invariant = step_values[0]
+        while True:
+            next_values = Ternary_Simulation.get_next_values(states, invariant)
+            joined = {state: Ternary_Simulation.join(invariant[state], next_values[state]) for state in invariant}
+            if joined == invariant:
+                break
+            invariant = joined
+
+        for state in states:
+            if isinstance(state.sid_line, Bitvector):
+                size = state.sid_line.size
+                Ternary_Simulation.number_of_state_bits += size
+                if state in invariant:
+                    state.ternary_values = [values[state] for values in step_values]
+                    state.ternary_invariant = invariant[state]
+                    mask = Ternary_Simulation.ones(size)
+                    for value in state.ternary_values:
+                        mask &= value[0] & ~(value[1] ^ state.ternary_values[0][1])
+                    Ternary_Simulation.number_of_step_constant_bits += mask.bit_count()
+                    Ternary_Simulation.number_of_invariant_bits += state.ternary_invariant[0].bit_count()
+
+# SAT sweeping
+
+import random
+
+class Sweep:
+    # merging functionally equivalent expressions before unrolling:
+    # candidates have equal values in random simulation, merges are confirmed by solver
+
+    SWEEP = False
+
+    VECTORS = 32 # number of random simulation vectors
+    TIMEOUT = 100 # milliseconds per solver query
+    RLIMIT = 20000 # Z3 resources per solver query, enforced more promptly than timeouts
+    ATTEMPTS = 2 # solver queries per expression
+    SEED = 0
+
+    number_of_nodes = 0
+    number_of_swept_nodes = 0
+    number_of_hashed_nodes = 0
+    number_of_candidates = 0
+    number_of_merges = 0
+    number_of_refutations = 0
+    number_of_timeouts = 0
+
+    sweeping_seconds = 0
+
+    def get_arguments(line):
+        return [getattr(line, name) for name in ['arg1_line', 'arg2_line', 'arg3_line'] if hasattr(line, name)]
+
+    def merge_arguments(line, representatives):
+        # representatives are never deeper than merged expressions
+        for name in ['arg1_line', 'arg2_line', 'arg3_line']:
+            if hasattr(line, name) and getattr(line, name) in representatives:
+                setattr(line, name, representatives[getattr(line, name)])
+
+    def get_structure(line):
+        # structurally equal expressions over merged arguments are equivalent
+        if isinstance(line, Variable):
+            return line
+        else:
+            return (type(line), line.sid_line,
+                *[getattr(line, name, None) for name in ['op', 'w', 'u', 'l', 'value', 'constant_line']],
+                *Sweep.get_arguments(line))
+
+    def get_roots():
+        return [*[(next_line, 'exp_line') for next_line in Next.nexts.values()],
+            *[(property_line, 'property_line') for property_line in Constraint.constraints.values()],
+            *[(property_line, 'property_line') for property_line in Bad.bads.values()]]
+
+    def get_nodes():
+        # expressions reachable from transitions and properties
+        nodes = {}
+        stack = [getattr(root, name) for root, name in Sweep.get_roots()]
+        while stack:
+            line = stack.pop()
+            if line not in nodes:
+                nodes[line] = None
+                stack.extend(Sweep.get_arguments(line))
+        return list(nodes)
+
+    def get_random_value(sid_line, generator):
+        if isinstance(sid_line, Array):
+            # random elements are unknown when read at unknown indexes
+            return Ternary_Array(Ternary_Simulation.unknown(), None,
+                generator.getrandbits(64), sid_line.element_size_line.size)
+        else:
+            return Ternary_Simulation.known(generator.getrandbits(sid_line.size), sid_line.size)
+
+    def get_signatures(nodes, variables):
+        generator = random.Random(Sweep.SEED)
+        signatures = {line: [] for line in nodes}
+        for vector in range(Sweep.VECTORS):
+            values = {variable: Sweep.get_random_value(variable.sid_line, generator) for variable in variables}
+            cache = {}
+            for line in nodes:
+                if isinstance(line.sid_line, Bitvector):
+                    signatures[line].append(line.get_ternary(values, cache))
+        return {line: (isinstance(line.sid_line, Bool), line.sid_line.size, tuple(signature))
+            for line, signature in signatures.items() if isinstance(line.sid_line, Bitvector)}
+
+    def get_array_counterexample(value, sid_line):
+        # array values other than constant arrays with stores remain unknown
+        elements = {}
+        while z3.is_store(value):
+            elements.setdefault(value.arg(1).as_long(),
+                Ternary_Simulation.known(value.arg(2).as_long(), sid_line.element_size_line.size))
+            value = value.arg(0)
+        if z3.is_const_array(value):
+            return Ternary_Array(Ternary_Simulation.known(value.arg(0).as_long(), sid_line.element_size_line.size), elements)
+        else:
+            return Ternary_Array(Ternary_Simulation.unknown())
+
+    def get_counterexample(model, variables):
+        values = {}
+        for variable in variables:
+            value = model.eval(variable.get_z3(), model_completion=True)
+            if isinstance(variable.sid_line, Array):
+                values[variable] = Sweep.get_array_counterexample(value, variable.sid_line)
+            elif isinstance(variable.sid_line, Bool):
+                values[variable] = Ternary_Simulation.known(int(z3.is_true(value)), 1)
+            else:
+                values[variable] = Ternary_Simulation.known(value.as_long(), variable.sid_line.size)
+        return values
+
+    def is_refuted(counterexamples, representative, line):
+        for values, cache in counterexamples:
+            value1 = representative.get_ternary(values, cache)
+            value2 = line.get_ternary(values, cache)
+            if value1[0] & value2[0] & (value1[1] ^ value2[1]):
+                return True
+        return False
+
+    def is_equivalent(solver, counterexamples, variables, representative, line):
+        solver.push()
+        solver.add(representative.get_z3() != line.get_z3())
+        result = solver.check()
+        if result == z3.sat:
+            counterexamples.append((Sweep.get_counterexample(solver.model(), variables), {}))
+        solver.pop()
+        if result == z3.unsat:
+            Sweep.number_of_merges += 1
+            return True
+        elif result == z3.sat:
+            Sweep.number_of_refutations += 1
+        else:
+            Sweep.number_of_timeouts += 1
+        return False
+
+    def sweep():
+        start_time = time.perf_counter()
+
+        nodes = Sweep.get_nodes()
+        Sweep.number_of_nodes = len(nodes)
+
+        solver = z3.Solver()
+        solver.set('timeout', Sweep.TIMEOUT)
+        solver.set('rlimit', Sweep.RLIMIT)
+
+        variables = [line for line in nodes if isinstance(line, Variable)]
+        counterexamples = []
+
+        signatures = Sweep.get_signatures(nodes, variables)
+
+        # shallowest expressions represent their equivalence classes
+        representatives = {}
+        structures = {}
+        classes = {}
+        for line in sorted(nodes, key=lambda line: (line.depth, line.nid)):
+            # arguments are merged before solver terms are created
+            Sweep.merge_arguments(line, representatives)
+            structure = Sweep.get_structure(line)
+            representative = structures.setdefault(structure, line)
+            # keep domains of expressions closed under merging
+            if representative is not line and representative.domain.keys() <= line.domain.keys():
+                Sweep.number_of_hashed_nodes += 1
+                representatives[line] = representative
+            elif line in signatures:
+                attempts = 0
+                for representative in classes.setdefault(signatures[line], []):
+                    if attempts == Sweep.ATTEMPTS:
+                        break
+                    elif (representative.domain.keys() <= line.domain.keys()
+                        and not Sweep.is_refuted(counterexamples, representative, line)):
+                        attempts += 1
+                        Sweep.number_of_candidates += 1
+                        if Sweep.is_equivalent(solver, counterexamples, variables, representative, line):
+                            representatives[line] = representative
+                            break
+                if line not in representatives:
+                    classes[signatures[line]].append(line)
+
+        for root, name in Sweep.get_roots():
+            if getattr(root, name) in representatives:
+                setattr(root, name, representatives[getattr(root, name)])
+
+        Sweep.number_of_swept_nodes = len(Sweep.get_nodes())
+        Sweep.sweeping_seconds = time.perf_counter() - start_time
+
 class Expression(Line):
     total_number_of_generated_expressions = 0
 
@@ -885,6 +1722,11 @@ class Expression(Line):
     def get_expression(self):
         return self
 
+    def get_ternary(self, states, cache):
+        if self not in cache:
+            cache[self] = self.compute_ternary(states, cache)
+        return cache[self]
+
     def get_z3_lambda(self):
         if self.z3_lambda is None:
             domain = self.get_domain()
@@ -943,6 +1785,9 @@ class Constant(Expression):
                 self.cache_values[0] = self
         return self.cache_values[0]
 
+    def compute_ternary(self, states, cache):
+        return Ternary_Simulation.known(self.value, self.sid_line.size)
+
     def get_z3(self):
         if self.z3 is None:
             if isinstance(self.sid_line, Bool):
@@ -1031,15 +1876,18 @@ class Constant_Array(Expression):
 
     def get_mapped_array_expression_for(self, index):
         if index is not None:
-            assert self.sid_line.is_mapped_array()
+            assert Array.is_mapped(self)
             return self.constant_line
         else:
-            assert not self.sid_line.is_mapped_array()
+            assert not Array.is_mapped(self)
             return self
 
     def get_values(self, step):
         return self
 
+    def compute_ternary(self, states, cache):
+        return Ternary_Array(self.constant_line.get_ternary(states, cache))
+
     def get_z3(self):
         if self.z3 is None:
             self.z3 = z3.K(self.sid_line.array_size_line.get_z3(), self.constant_line.get_z3())
@@ -1073,22 +1921,29 @@ class Variable(Expression):
                 raise model_error("bitvector", self.line_no)
         elif self.sid_line.is_mapped_array():
             Array.number_of_mapped_arrays += 1
+            # elements are created once accessed indexes are known
             self.array = {}
-            for index in range(2**self.sid_line.array_size_line.size):
-                self.array[index] = type(self)(self.nid + index + 1, self.sid_line.element_size_line,
-                    self.symbol, f"{self.comment} @ index {index}", self.line_no, index)
+
+    def new_mapped_array_elements(self, indexes):
+        for index in indexes:
+            self.array[index] = type(self)(self.nid + index + 1, self.sid_line.element_size_line,
+                self.symbol, f"{self.comment} @ index {index}", self.line_no, index)
+            Array.number_of_mapped_elements += 1
 
     def new_input(self, index):
-        if index is not None or not self.sid_line.is_mapped_array():
+        if index is not None or not Array.is_mapped(self):
             assert self.nid not in Variable.inputs, f"variable nid {self.nid} already defined @ {self.line_no}"
             Variable.inputs[self.nid] = self
 
     def get_mapped_array_expression_for(self, index):
         if index is not None:
-            assert self.sid_line.is_mapped_array()
-            return self.array[index]
+            assert Array.is_mapped(self)
+            if index in self.array:
+                return self.array[index]
+            else:
+                return Array.get_default_element(self)
         else:
-            assert not self.sid_line.is_mapped_array()
+            assert not Array.is_mapped(self)
             return self
 
     def get_values(self, step):
@@ -1105,6 +1960,14 @@ class Variable(Expression):
                 self.cache_values[0] = self
         return self.cache_values[0]
 
+    def compute_ternary(self, states, cache):
+        if self in states:
+            return states[self]
+        elif isinstance(self.sid_line, Array):
+            return Ternary_Array(Ternary_Simulation.unknown())
+        else:
+            return Ternary_Simulation.unknown()
+
     def get_z3(self):
         if self.z3 is None:
             self.z3 = z3.Const(self.name, self.sid_line.get_z3())
@@ -1145,6 +2008,8 @@ class Instance:
     PROPAGATE_ITE = True
     LAMBDAS = True
 
+    propagation_seconds = 0
+
     def __init__(self, instance_of):
         self.instance_of = instance_of
         self.cache_instance = {}
@@ -1173,7 +2038,9 @@ class Instance:
         # bad instances may be overwritten if proven false
         self.cache_instance[step] = instance
         if Instance.PROPAGATE is not None:
+            start_time = time.perf_counter()
             self.cache_instance[step] = self.cache_instance[step].get_values(step)
+            Instance.propagation_seconds += time.perf_counter() - start_time
 
     def get_z3_select(self, step):
         if step not in self.cache_z3_instance:
@@ -1255,6 +2122,8 @@ class State(Variable):
         self.next_line = None
         self.cache_z3_name = {}
         self.cache_bitwuzla_name = {}
+        self.ternary_values = []
+        self.ternary_invariant = None
         self.instance = Instance(self)
         self.instance.init_instance(self) # initialize with itself upon creation of state
         self.new_state(index)
@@ -1266,7 +2135,7 @@ class State(Variable):
         return f"{self.nid} {State.keyword} {self.sid_line.nid} {self.symbol} {self.comment}"
 
     def new_state(self, index):
-        if index is not None or not self.sid_line.is_mapped_array():
+        if index is not None or not Array.is_mapped(self):
             assert self.nid not in State.states, f"state nid {self.nid} already defined @ {self.line_no}"
             State.states[self.nid] = self
 
@@ -1277,7 +2146,7 @@ class State(Variable):
                 return
 
     def get_mapped_array_expression_for(self, index):
-        if isinstance(self.sid_line, Bitvector) or self.sid_line.is_mapped_array():
+        if isinstance(self.sid_line, Bitvector) or Array.is_mapped(self):
             if self.init_line is not None and self.next_line is not None and self.next_line.exp_line is self:
                 # propagate initial value of initialized read-only bitvector states
                 return self.init_line.exp_line.get_mapped_array_expression_for(index)
@@ -1307,6 +2176,15 @@ class State(Variable):
         else:
             return instance
 
+    def get_ternary_value(self, step):
+        # known bits of state in step by ternary simulation
+        if self.ternary_invariant is None:
+            return Ternary_Simulation.unknown()
+        elif step < len(self.ternary_values):
+            return self.ternary_values[step]
+        else:
+            return self.ternary_invariant
+
     def get_step_name(self, step):
         return f"{self.name}-{step}"
 
@@ -1314,7 +2192,9 @@ class State(Variable):
         if step == -1:
             step = 0
         if step not in self.cache_z3_name:
-            self.cache_z3_name[step] = z3.Const(self.get_step_name(step), self.sid_line.get_z3())
+            self.cache_z3_name[step] = Ternary_Simulation.get_z3_name(
+                z3.Const(self.get_step_name(step), self.sid_line.get_z3()),
+                self.sid_line, self.get_ternary_value(step))
         return self.cache_z3_name[step]
 
     def get_z3_instance(self, step):
@@ -1337,8 +2217,9 @@ class State(Variable):
         if step == -1:
             step = 0
         if step not in self.cache_bitwuzla_name:
-            self.cache_bitwuzla_name[step] = tm.mk_const(self.sid_line.get_bitwuzla(tm),
-                self.get_step_name(step))
+            self.cache_bitwuzla_name[step] = Ternary_Simulation.get_bitwuzla_name(
+                tm.mk_const(self.sid_line.get_bitwuzla(tm), self.get_step_name(step)),
+                self.sid_line, self.get_ternary_value(step), tm)
         return self.cache_bitwuzla_name[step]
 
     def get_bitwuzla_instance(self, step, tm):
@@ -1400,6 +2281,20 @@ class Ext(Indexed):
             self.cache_values[step] = self.copy(arg1_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        mask, bits = self.arg1_line.get_ternary(states, cache)
+        size = self.arg1_line.sid_line.size
+        extension = Ternary_Simulation.ones(self.w) << size
+        if self.op == OP_SEXT:
+            if (mask >> (size - 1)) & 1:
+                # known sign bit
+                return (mask | extension, bits | extension if (bits >> (size - 1)) & 1 else bits)
+            else:
+                return (mask, bits)
+        else:
+            assert self.op == OP_UEXT
+            return (mask | extension, bits)
+
     def get_z3(self):
         if self.z3 is None:
             if self.op == OP_SEXT:
@@ -1454,6 +2349,11 @@ class Slice(Indexed):
             self.cache_values[step] = self.copy(arg1_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        mask, bits = self.arg1_line.get_ternary(states, cache)
+        ones = Ternary_Simulation.ones(self.u - self.l + 1)
+        return ((mask >> self.l) & ones, (bits >> self.l) & ones)
+
     def get_z3(self):
         if self.z3 is None:
             self.z3 = z3.Extract(self.u, self.l, self.arg1_line.get_z3())
@@ -1522,6 +2422,22 @@ class Unary(Expression):
             self.cache_values[step] = self.copy(arg1_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        value = self.arg1_line.get_ternary(states, cache)
+        size = self.sid_line.size
+        if self.op == OP_NOT:
+            return (value[0], ~value[1] & value[0])
+        elif self.op == OP_INC:
+            return Ternary_Simulation.get_arithmetic(value, Ternary_Simulation.known(1, size), size,
+                lambda x, y: x + y)
+        elif self.op == OP_DEC:
+            return Ternary_Simulation.get_arithmetic(value, Ternary_Simulation.known(1, size), size,
+                lambda x, y: x - y)
+        else:
+            assert self.op == OP_NEG
+            return Ternary_Simulation.get_arithmetic(Ternary_Simulation.known(0, size), value, size,
+                lambda x, y: x - y)
+
     def get_z3(self):
         if self.z3 is None:
             z3_arg1 = self.arg1_line.get_z3()
@@ -1626,6 +2542,18 @@ class Implies(Binary):
             self.cache_values[step] = self.copy(arg1_value, arg2_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        value1 = self.arg1_line.get_ternary(states, cache)
+        if Ternary_Simulation.is_false(value1):
+            return (1, 1)
+        value2 = self.arg2_line.get_ternary(states, cache)
+        if Ternary_Simulation.is_true(value2):
+            return (1, 1)
+        elif Ternary_Simulation.is_true(value1) and Ternary_Simulation.is_false(value2):
+            return (1, 0)
+        else:
+            return Ternary_Simulation.unknown()
+
     def get_z3(self):
         if self.z3 is None:
             self.z3 = z3.Implies(self.arg1_line.get_z3(), self.arg2_line.get_z3())
@@ -1683,6 +2611,57 @@ class Comparison(Binary):
             self.cache_values[step] = self.copy(arg1_value, arg2_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        value1 = self.arg1_line.get_ternary(states, cache)
+        value2 = self.arg2_line.get_ternary(states, cache)
+        sid_line = self.arg1_line.sid_line
+        if self.op in {OP_EQ, OP_NEQ}:
+            if value1[0] & value2[0] & (value1[1] ^ value2[1]):
+                # conflicting known bits
+                result = False
+            elif Ternary_Simulation.is_known(value1, sid_line.size) and Ternary_Simulation.is_known(value2, sid_line.size):
+                result = True
+            else:
+                return Ternary_Simulation.unknown()
+            if self.op == OP_NEQ:
+                result = not result
+        elif Ternary_Simulation.is_known(value1, sid_line.size) and Ternary_Simulation.is_known(value2, sid_line.size):
+            x, y = value1[1], value2[1]
+            if self.op in {OP_SGT, OP_SGTE, OP_SLT, OP_SLTE}:
+                x, y = sid_line.get_signed_value(x), sid_line.get_signed_value(y)
+            if self.op in {OP_SGT, OP_UGT}:
+                result = x > y
+            elif self.op in {OP_SGTE, OP_UGTE}:
+                result = x >= y
+            elif self.op in {OP_SLT, OP_ULT}:
+                result = x < y
+            else:
+                assert self.op in {OP_SLTE, OP_ULTE}
+                result = x <= y
+        elif self.op in {OP_UGT, OP_UGTE, OP_ULT, OP_ULTE}:
+            # unsigned comparison of intervals
+            min1, max1 = Ternary_Simulation.get_unsigned_bounds(value1, sid_line.size)
+            min2, max2 = Ternary_Simulation.get_unsigned_bounds(value2, sid_line.size)
+            if self.op in {OP_ULT, OP_ULTE}:
+                min1, max1, min2, max2 = min2, max2, min1, max1
+            if self.op in {OP_UGT, OP_ULT}:
+                if min1 > max2:
+                    result = True
+                elif max1 <= min2:
+                    result = False
+                else:
+                    return Ternary_Simulation.unknown()
+            else:
+                if min1 >= max2:
+                    result = True
+                elif max1 < min2:
+                    result = False
+                else:
+                    return Ternary_Simulation.unknown()
+        else:
+            return Ternary_Simulation.unknown()
+        return Ternary_Simulation.known(int(result), 1)
+
     def get_z3(self):
         if self.z3 is None:
             z3_arg1 = self.arg1_line.get_z3()
@@ -1804,6 +2783,22 @@ class Logical(Binary):
             self.cache_values[step] = self.copy(arg1_value, arg2_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        mask1, bits1 = self.arg1_line.get_ternary(states, cache)
+        mask2, bits2 = self.arg2_line.get_ternary(states, cache)
+        if self.op == OP_AND:
+            zeros = (mask1 & ~bits1) | (mask2 & ~bits2)
+            ones = bits1 & bits2
+            return (zeros | ones, ones)
+        elif self.op == OP_OR:
+            zeros = mask1 & ~bits1 & mask2 & ~bits2
+            ones = bits1 | bits2
+            return (zeros | ones, ones)
+        else:
+            assert self.op == OP_XOR
+            mask = mask1 & mask2
+            return (mask, (bits1 ^ bits2) & mask)
+
     def get_z3(self):
         if self.z3 is None:
             z3_arg1 = self.arg1_line.get_z3()
@@ -1894,6 +2889,60 @@ class Computation(Binary):
             self.cache_values[step] = self.copy(arg1_value, arg2_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        value1 = self.arg1_line.get_ternary(states, cache)
+        value2 = self.arg2_line.get_ternary(states, cache)
+        size = self.sid_line.size
+        ones = Ternary_Simulation.ones(size)
+        if self.op == OP_ADD:
+            return Ternary_Simulation.get_arithmetic(value1, value2, size, lambda x, y: x + y)
+        elif self.op == OP_SUB:
+            return Ternary_Simulation.get_arithmetic(value1, value2, size, lambda x, y: x - y)
+        elif self.op == OP_MUL:
+            return Ternary_Simulation.get_arithmetic(value1, value2, size, lambda x, y: x * y)
+        elif self.op in {OP_SLL, OP_SRL, OP_SRA}:
+            if not Ternary_Simulation.is_known(value2, size):
+                return Ternary_Simulation.unknown()
+            shift = min(value2[1], size)
+            shifted_in = Ternary_Simulation.ones(shift)
+            if self.op == OP_SLL:
+                return (((value1[0] << shift) | shifted_in) & ones, (value1[1] << shift) & ones)
+            elif self.op == OP_SRL:
+                return ((value1[0] >> shift) | (shifted_in << (size - shift)), value1[1] >> shift)
+            else:
+                assert self.op == OP_SRA
+                if (value1[0] >> (size - 1)) & 1:
+                    # known sign bit
+                    sign_bits = shifted_in << (size - shift) if (value1[1] >> (size - 1)) & 1 else 0
+                    return ((value1[0] >> shift) | (shifted_in << (size - shift)), (value1[1] >> shift) | sign_bits)
+                else:
+                    return (value1[0] >> shift, value1[1] >> shift)
+        elif Ternary_Simulation.is_known(value1, size) and Ternary_Simulation.is_known(value2, size):
+            x, y = value1[1], value2[1]
+            signed_x, signed_y = self.sid_line.get_signed_value(x), self.sid_line.get_signed_value(y)
+            if self.op == OP_UDIV:
+                result = x // y if y != 0 else ones
+            elif self.op == OP_UREM:
+                result = x % y if y != 0 else x
+            elif self.op == OP_SDIV:
+                if y == 0:
+                    result = 1 if signed_x < 0 else ones
+                else:
+                    result = abs(signed_x) // abs(signed_y)
+                    if (signed_x < 0) != (signed_y < 0):
+                        result = -result
+            else:
+                assert self.op == OP_SREM
+                if y == 0:
+                    result = x
+                else:
+                    result = abs(signed_x) % abs(signed_y)
+                    if signed_x < 0:
+                        result = -result
+            return Ternary_Simulation.known(result, size)
+        else:
+            return Ternary_Simulation.unknown()
+
     def get_z3(self):
         if self.z3 is None:
             z3_arg1 = self.arg1_line.get_z3()
@@ -1976,6 +3025,12 @@ class Concat(Binary):
             self.cache_values[step] = self.copy(arg1_value, arg2_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        mask1, bits1 = self.arg1_line.get_ternary(states, cache)
+        mask2, bits2 = self.arg2_line.get_ternary(states, cache)
+        size2 = self.arg2_line.sid_line.size
+        return ((mask1 << size2) | mask2, (bits1 << size2) | bits2)
+
     def get_z3(self):
         if self.z3 is None:
             self.z3 = z3.Concat(self.arg1_line.get_z3(), self.arg2_line.get_z3())
@@ -1992,6 +3047,14 @@ class Read(Binary):
 
     READ_ARRAY_ITERATIVELY = True
 
+    READ_OVER_WRITE = False
+
+    # read-over-write simplification per array and index
+
+    read_over_write_cache = {}
+
+    number_of_reads_over_writes = 0
+
     def __init__(self, nid, op, sid_line, arg1_line, arg2_line, comment, line_no):
         assert op == Read.keyword
         super().__init__(nid, Read.keyword, sid_line, arg1_line, arg2_line, comment, line_no)
@@ -2003,10 +3066,61 @@ class Read(Binary):
             raise model_error("compatible result and first operand element size sorts", line_no)
         self.read_cache = None
 
+    def get_base_and_offset(index_line):
+        # index as sum of base and constant offset, base is None for constant indexes
+        if isinstance(index_line, Constant):
+            return None, index_line.value % 2**index_line.sid_line.size
+        elif isinstance(index_line, Computation) and index_line.op in {OP_ADD, OP_SUB}:
+            if isinstance(index_line.arg2_line, Constant):
+                base_line, offset = Read.get_base_and_offset(index_line.arg1_line)
+                if index_line.op == OP_ADD:
+                    return base_line, (offset + index_line.arg2_line.value) % 2**index_line.sid_line.size
+                else:
+                    return base_line, (offset - index_line.arg2_line.value) % 2**index_line.sid_line.size
+            elif index_line.op == OP_ADD and isinstance(index_line.arg1_line, Constant):
+                base_line, offset = Read.get_base_and_offset(index_line.arg2_line)
+                return base_line, (offset + index_line.arg1_line.value) % 2**index_line.sid_line.size
+        return index_line, 0
+
+    def are_equal_indexes(index_line1, index_line2):
+        # True if equal, False if distinct, None if unknown
+        base_line1, offset1 = Read.get_base_and_offset(index_line1)
+        base_line2, offset2 = Read.get_base_and_offset(index_line2)
+        if base_line1 is base_line2:
+            return offset1 == offset2
+        else:
+            return None
+
+    def read_over_write(self, array_line, index_line):
+        if (array_line, index_line) not in Read.read_over_write_cache:
+            read_line = None
+            write_line = array_line
+            while read_line is None:
+                if isinstance(write_line, Write):
+                    are_equal_indexes = Read.are_equal_indexes(write_line.arg2_line, index_line)
+                    if are_equal_indexes:
+                        read_line = write_line.arg3_line
+                    elif are_equal_indexes is False:
+                        # skip writes to distinct indexes
+                        write_line = write_line.arg1_line
+                        continue
+                elif isinstance(write_line, Constant_Array):
+                    read_line = write_line.constant_line
+                if read_line is None:
+                    read_line = self.copy(write_line, index_line)
+                else:
+                    Read.number_of_reads_over_writes += 1
+            Read.read_over_write_cache[(array_line, index_line)] = read_line
+        return Read.read_over_write_cache[(array_line, index_line)]
+
     def read_array_iterative(self, array_line, index_line):
-        for index in range(2**array_line.sid_line.array_size_line.size):
-            if index == 0:
-                read_line = array_line.get_mapped_array_expression_for(0)
+        indexes = Array.get_mapped_indexes(array_line)
+        if array_line in Array.sparse_indexes:
+            # untouched elements of sparse arrays
+            read_line = Array.get_default_element(array_line)
+        for index in indexes:
+            if index == indexes[0] and array_line not in Array.sparse_indexes:
+                read_line = array_line.get_mapped_array_expression_for(index)
             else:
                 read_line = Ite(next_nid(), self.sid_line,
                     Comparison(next_nid(), OP_EQ, Bool.boolean,
@@ -2021,6 +3135,11 @@ class Read(Binary):
 
     def read_array_recursive(self, array_line, index_line, index_array, zero_line):
         assert 2 <= len(index_array) == 2**math.log2(len(index_array))
+        if array_line in Array.sparse_indexes:
+            indexes = Array.sparse_indexes[array_line]
+            if bisect.bisect_left(indexes, index_array[0]) == bisect.bisect_left(indexes, index_array[-1] + 1):
+                # no touched elements in index range of sparse arrays
+                return Array.get_default_element(array_line)
         if len(index_array) == 2:
             even_line = array_line.get_mapped_array_expression_for(index_array[0])
             odd_line = array_line.get_mapped_array_expression_for(index_array[1])
@@ -2042,18 +3161,22 @@ class Read(Binary):
             f"read value from {array_line.comment[2:]} @ reset or set {address_bit}-th address bit", self.line_no)
 
     def read_array(self, array_line, index_line):
-        if array_line.sid_line.is_mapped_array():
+        if Array.is_mapped(array_line):
             if isinstance(index_line, Constant):
                 return array_line.get_mapped_array_expression_for(index_line.value)
             else:
-                if Read.READ_ARRAY_ITERATIVELY:
+                if Array.is_read_iteratively(array_line):
                     return self.read_array_iterative(array_line, index_line)
                 else:
                     return self.read_array_recursive(array_line, index_line,
-                        list(range(2**array_line.sid_line.array_size_line.size)),
+                        range(2**array_line.sid_line.array_size_line.size),
                         Zero(next_nid(),
                             Bitvec(next_nid(), 1, "1-bit bitvector for testing bits", self.line_no),
                             "", "zero value for testing bits", self.line_no))
+        elif Lookup.LOOKUP_TABLES and Lookup.get_table_line(array_line) is not None:
+            return Lookup.new_lookup(self, Lookup.get_table_line(array_line), index_line)
+        elif Read.READ_OVER_WRITE:
+            return self.read_over_write(array_line.get_mapped_array_expression_for(None), index_line)
         else:
             return self.copy(array_line.get_mapped_array_expression_for(None), index_line)
 
@@ -2069,9 +3192,17 @@ class Read(Binary):
         if step not in self.cache_values:
             arg1_value = self.arg1_line.get_values(step).get_expression()
             arg2_value = self.arg2_line.get_values(step).get_expression()
-            self.cache_values[step] = self.copy(arg1_value, arg2_value)
+            if Read.READ_OVER_WRITE:
+                self.cache_values[step] = self.read_over_write(arg1_value, arg2_value)
+            else:
+                self.cache_values[step] = self.copy(arg1_value, arg2_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        array = self.arg1_line.get_ternary(states, cache)
+        index = self.arg2_line.get_ternary(states, cache)
+        return array.read(index, self.arg2_line.sid_line.size)
+
     def get_z3(self):
         if self.z3 is None:
             self.z3 = z3.Select(self.arg1_line.get_z3(), self.arg2_line.get_z3())
@@ -2083,6 +3214,81 @@ class Read(Binary):
                 [self.arg1_line.get_bitwuzla(tm), self.arg2_line.get_bitwuzla(tm)])
         return self.bitwuzla
 
+class Lookup(Read):
+    # reads from initialized read-only arrays as lookups in constant tables
+
+    LOOKUP_TABLES = False
+
+    table_lines = {}
+    tables = {}
+    lookup_cache = {}
+
+    number_of_lookups = 0
+
+    def __init__(self, nid, op, sid_line, arg1_line, arg2_line, comment, line_no):
+        super().__init__(nid, op, sid_line, arg1_line, arg2_line, comment, line_no)
+        assert arg1_line in Lookup.tables
+        self.table, self.default_line = Lookup.tables[arg1_line]
+        Lookup.number_of_lookups += 1
+
+    def is_read_only(array_line):
+        return (isinstance(array_line, State) and array_line.init_line is not None
+            and array_line.next_line is not None and array_line.next_line.exp_line is array_line)
+
+    def get_table_line(array_line):
+        # constant write chain equal to initialized read-only array state, if any
+        if array_line not in Lookup.table_lines:
+            Lookup.table_lines[array_line] = None
+            if Lookup.is_read_only(array_line):
+                table = {}
+                line = array_line
+                while Lookup.is_read_only(line) or isinstance(line, Write):
+                    if isinstance(line, State):
+                        line = line.init_line.exp_line
+                    elif isinstance(line.arg2_line, Constant) and isinstance(line.arg3_line, Constant):
+                        # later writes overwrite earlier writes
+                        index = line.arg2_line.value % 2**line.arg2_line.sid_line.size
+                        table.setdefault(index, (line.arg2_line, line.arg3_line))
+                        line = line.arg1_line
+                    else:
+                        break
+                if isinstance(line, Constant_Array):
+                    table_line = line
+                    for index in sorted(table):
+                        table_line = Write(next_nid(), array_line.sid_line, table_line, *table[index],
+                            f"lookup table of {array_line.comment[2:]} @ index {index}", array_line.line_no)
+                    Lookup.tables[table_line] = ({index: table[index][1] for index in table}, line.constant_line)
+                    Lookup.table_lines[array_line] = table_line
+        return Lookup.table_lines[array_line]
+
+    def new_lookup(read_line, table_line, index_line):
+        if (table_line, index_line) not in Lookup.lookup_cache:
+            if isinstance(index_line, Constant):
+                table, default_line = Lookup.tables[table_line]
+                index = index_line.value % 2**index_line.sid_line.size
+                Lookup.lookup_cache[(table_line, index_line)] = table[index] if index in table else default_line
+            else:
+                Lookup.lookup_cache[(table_line, index_line)] = Lookup(next_nid(), OP_READ, read_line.sid_line,
+                    table_line, index_line, read_line.comment, read_line.line_no)
+        return Lookup.lookup_cache[(table_line, index_line)]
+
+    def lookup(self, index):
+        return (self.table[index] if index in self.table else self.default_line).value % 2**self.sid_line.size
+
+    def get_mapped_array_expression_for(self, index):
+        assert index is None
+        return self
+
+    def get_values(self, step):
+        if step not in self.cache_values:
+            arg2_value = self.arg2_line.get_values(step)
+            if isinstance(arg2_value, Values):
+                # specialize lookup to propagated indexes
+                self.cache_values[step] = arg2_value.apply_unary(self.sid_line, self.lookup)
+            else:
+                self.cache_values[step] = self.copy(self.arg1_line, arg2_value)
+        return self.cache_values[step]
+
 class Ternary(Expression):
     keywords = {OP_ITE, OP_WRITE}
 
@@ -2185,6 +3391,16 @@ class Ite(Ternary):
             self.cache_values[step] = self.copy(arg1_value, arg2_value, arg3_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        condition = self.arg1_line.get_ternary(states, cache)
+        if Ternary_Simulation.is_true(condition):
+            return self.arg2_line.get_ternary(states, cache)
+        elif Ternary_Simulation.is_false(condition):
+            return self.arg3_line.get_ternary(states, cache)
+        else:
+            return Ternary_Simulation.join(self.arg2_line.get_ternary(states, cache),
+                self.arg3_line.get_ternary(states, cache))
+
     def get_z3(self):
         if self.z3 is None:
             self.z3 = z3.If(self.arg1_line.get_z3(), self.arg2_line.get_z3(), self.arg3_line.get_z3())
@@ -2221,6 +3437,8 @@ class Write(Ternary):
             raise model_error("compatible first operand element size and third operand sorts", line_no)
         self.write_cache = {}
 
+    number_of_collapsed_writes = 0
+
     def copy(self, arg1_line, arg2_line, arg3_line):
         if self.arg1_line is not arg1_line or self.arg2_line is not arg2_line or self.arg3_line is not arg3_line:
             Expression.total_number_of_generated_expressions += 1
@@ -2228,8 +3446,20 @@ class Write(Ternary):
         else:
             return self
 
+    def write_over_write(self, array_line, index_line, value_line):
+        if isinstance(value_line, Read) and value_line.arg1_line is array_line:
+            if Read.are_equal_indexes(value_line.arg2_line, index_line):
+                # writing value read from same index
+                Write.number_of_collapsed_writes += 1
+                return array_line
+        if isinstance(array_line, Write) and Read.are_equal_indexes(array_line.arg2_line, index_line):
+            # overwriting value written to same index
+            Write.number_of_collapsed_writes += 1
+            array_line = array_line.arg1_line
+        return self.copy(array_line, index_line, value_line)
+
     def write_array(self, array_line, index_line, value_line, index):
-        if self.sid_line.is_mapped_array():
+        if Array.is_mapped(self):
             assert index is not None
             if isinstance(index_line, Constant):
                 if index_line.value == index:
@@ -2248,7 +3478,10 @@ class Write(Ternary):
                     f"write value to {array_line.comment[2:]} @ address if equal to index {index}", self.line_no)
         else:
             assert index is None
-            return self.copy(array_line, index_line, value_line)
+            if Read.READ_OVER_WRITE:
+                return self.write_over_write(array_line, index_line, value_line)
+            else:
+                return self.copy(array_line, index_line, value_line)
 
     def get_mapped_array_expression_for(self, index):
         if index not in self.write_cache:
@@ -2263,9 +3496,18 @@ class Write(Ternary):
             arg1_value = self.arg1_line.get_values(step).get_expression()
             arg2_value = self.arg2_line.get_values(step).get_expression()
             arg3_value = self.arg3_line.get_values(step).get_expression()
-            self.cache_values[step] = self.copy(arg1_value, arg2_value, arg3_value)
+            if Read.READ_OVER_WRITE:
+                self.cache_values[step] = self.write_over_write(arg1_value, arg2_value, arg3_value)
+            else:
+                self.cache_values[step] = self.copy(arg1_value, arg2_value, arg3_value)
         return self.cache_values[step]
 
+    def compute_ternary(self, states, cache):
+        array = self.arg1_line.get_ternary(states, cache)
+        index = self.arg2_line.get_ternary(states, cache)
+        value = self.arg3_line.get_ternary(states, cache)
+        return array.write(index, value, self.arg2_line.sid_line.size)
+
     def get_z3(self):
         if self.z3 is None:
             self.z3 = z3.Store(self.arg1_line.get_z3(), self.arg2_line.get_z3(), self.arg3_line.get_z3())
@@ -2305,11 +3547,14 @@ class Transitional(Line):
             if not isinstance(self.sid_line, Bitvector):
                 raise model_error("bitvector", self.line_no)
         elif self.sid_line.is_mapped_array():
+            # elements are created once elements of state are created
             self.array = {}
-            for index in self.state_line.array.keys():
-                self.array[index] = type(self)(self.nid + index + 1, self.sid_line.element_size_line,
-                    self.state_line.array[index], self.state_line.array[index], self.symbol,
-                    f"{self.comment} @ index {index}", self.line_no, self, index)
+
+    def new_mapped_array_elements(self):
+        for index in self.state_line.array.keys():
+            self.array[index] = type(self)(self.nid + index + 1, self.sid_line.element_size_line,
+                self.state_line.array[index], self.state_line.array[index], self.symbol,
+                f"{self.comment} @ index {index}", self.line_no, self, index)
 
     def set_mapped_array_expression(self):
         if self.index is None:
@@ -2324,7 +3569,7 @@ class Transitional(Line):
                 return
 
     def new_transition(self, transitions, index):
-        if index is not None or not self.sid_line.is_mapped_array():
+        if index is not None or not Array.is_mapped(self.state_line):
             assert self.nid not in transitions, f"transition nid {self.nid} already defined @ {self.line_no}"
             transitions[self.nid] = self
 
@@ -2505,8 +3750,13 @@ class Bad(Property):
 
     bads = {}
 
+    # bad properties no longer checked after first counterexample
+    retired_bads = set()
+
     def __init__(self, nid, property_line, symbol, comment, line_no):
         super().__init__(nid, property_line, symbol, comment, line_no)
+        # steps at which bad property is reachable
+        self.sat_steps = set()
         self.new_bad()
 
     def __str__(self):
@@ -2608,7 +3858,7 @@ def new_binary(op, sid, left_nid, right_nid, comment, nid = None, line_no = None
     return get_class(op)(next_nid(nid), op, sid, left_nid, right_nid, comment, line_no)
 
 def new_binary_boolean(op, left_nid, right_nid, comment, nid = None, line_no = None):
-    assert op in Implies.keyword + Comparison.keywords + Logical.keywords
+    assert op in {Implies.keyword} | Comparison.keywords | Logical.keywords
     return get_class(op)(next_nid(nid), op, SID_BOOLEAN, left_nid, right_nid, comment, line_no)
 
 def new_ternary(op, sid, first_nid, second_nid, third_nid, comment, nid = None, line_no = None):
@@ -2616,10 +3866,10 @@ def new_ternary(op, sid, first_nid, second_nid, third_nid, comment, nid = None,
     return get_class(op)(next_nid(nid), sid, first_nid, second_nid, third_nid, comment, line_no)
 
 def new_init(sid, state_nid, value_nid, comment, nid = None, line_no = None):
-    return Init(next_nid(nid), sid, state_nid, value_nid, comment, line_no)
+    return Init(next_nid(nid), sid, state_nid, value_nid, "", comment, line_no)
 
 def new_next(sid, state_nid, value_nid, comment, nid = None, line_no = None):
-    return Next(next_nid(nid), sid, state_nid, value_nid, comment, line_no)
+    return Next(next_nid(nid), sid, state_nid, value_nid, "", comment, line_no)
 
 def new_init_next(op, sid, state_nid, value_nid, symbol, comment, nid = None, line_no = None):
     return get_class(op)(next_nid(nid), sid, state_nid, value_nid, symbol, comment, line_no)
@@ -3728,6 +4978,162 @@ def init_compressed_instruction_codes():
 
 RVC = True # RVC support
 
+LOADEDIDSONLY = False # restrict modeling to instructions in loaded code
+
+instruction_IDs = None # IDs of instructions in loaded code if restricted
+
+def decode_shift_ID(instruction, sll_ID, srl_ID, sra_ID, is_word_shift):
+    # shift amounts of 64-bit targets extend into funct7 except for word shifts
+    funct3 = get_bits(instruction, 12, 3)
+    if IS64BITTARGET and not is_word_shift:
+        funct = get_bits(instruction, 26, 6)
+        funct_sll_srl, funct_sra = F6_SLL_SRL, F6_SRA
+    else:
+        funct = get_bits(instruction, 25, 7)
+        funct_sll_srl, funct_sra = F7_ADD, F7_SUB
+    if funct3 == F3_SLL:
+        return sll_ID if funct == funct_sll_srl else ID_UNKNOWN
+    elif funct == funct_sll_srl:
+        return srl_ID
+    elif funct == funct_sra:
+        return sra_ID
+    else:
+        return ID_UNKNOWN
+
+def decode_instruction_ID(instruction):
+    # encodings of instructions not modeled, including illegal instructions, decode to ID_UNKNOWN
+    opcode = get_bits(instruction, 0, 7)
+    funct3 = get_bits(instruction, 12, 3)
+    funct7 = get_bits(instruction, 25, 7)
+    if opcode == OP_LOAD:
+        if IS64BITTARGET:
+            return {F3_LB: ID_LB, F3_LH: ID_LH, F3_LW: ID_LW, F3_LD: ID_LD,
+                F3_LBU: ID_LBU, F3_LHU: ID_LHU, F3_LWU: ID_LWU}.get(funct3, ID_UNKNOWN)
+        return {F3_LB: ID_LB, F3_LH: ID_LH, F3_LW: ID_LW,
+            F3_LBU: ID_LBU, F3_LHU: ID_LHU}.get(funct3, ID_UNKNOWN)
+    elif opcode == OP_IMM:
+        if funct3 in (F3_SLL, F3_SRL):
+            return decode_shift_ID(instruction, ID_SLLI, ID_SRLI, ID_SRAI, False)
+        return {F3_ADDI: ID_ADDI, F3_SLT: ID_SLTI, F3_SLTU: ID_SLTIU, F3_XOR: ID_XORI,
+            F3_OR: ID_ORI, F3_AND: ID_ANDI}.get(funct3, ID_UNKNOWN)
+    elif opcode == OP_IMM_32 and IS64BITTARGET:
+        if funct3 in (F3_SLL, F3_SRL):
+            return decode_shift_ID(instruction, ID_SLLIW, ID_SRLIW, ID_SRAIW, True)
+        return {F3_ADDI: ID_ADDIW}.get(funct3, ID_UNKNOWN)
+    elif opcode == OP_STORE:
+        if IS64BITTARGET:
+            return {F3_SB: ID_SB, F3_SH: ID_SH, F3_SW: ID_SW, F3_SD: ID_SD}.get(funct3, ID_UNKNOWN)
+        return {F3_SB: ID_SB, F3_SH: ID_SH, F3_SW: ID_SW}.get(funct3, ID_UNKNOWN)
+    elif opcode == OP_OP:
+        if funct7 == F7_MUL:
+            return {F3_MUL: ID_MUL, F3_MULH: ID_MULH, F3_MULHSU: ID_MULHSU, F3_MULHU: ID_MULHU,
+                F3_DIV: ID_DIV, F3_DIVU: ID_DIVU, F3_REM: ID_REM, F3_REMU: ID_REMU}.get(funct3, ID_UNKNOWN)
+        elif funct7 == F7_SUB:
+            return {F3_SUB: ID_SUB, F3_SRA: ID_SRA}.get(funct3, ID_UNKNOWN)
+        elif funct7 == F7_ADD:
+            return {F3_ADD: ID_ADD, F3_SLL: ID_SLL, F3_SLT: ID_SLT, F3_SLTU: ID_SLTU,
+                F3_XOR: ID_XOR, F3_SRL: ID_SRL, F3_OR: ID_OR, F3_AND: ID_AND}.get(funct3, ID_UNKNOWN)
+        return ID_UNKNOWN
+    elif opcode == OP_OP_32 and IS64BITTARGET:
+        if funct7 == F7_MUL:
+            return {F3_MUL: ID_MULW, F3_DIV: ID_DIVW, F3_DIVU: ID_DIVUW,
+                F3_REM: ID_REMW, F3_REMU: ID_REMUW}.get(funct3, ID_UNKNOWN)
+        elif funct7 == F7_SUB:
+            return {F3_SUB: ID_SUBW, F3_SRA: ID_SRAW}.get(funct3, ID_UNKNOWN)
+        elif funct7 == F7_ADD:
+            return {F3_ADD: ID_ADDW, F3_SLL: ID_SLLW, F3_SRL: ID_SRLW}.get(funct3, ID_UNKNOWN)
+        return ID_UNKNOWN
+    elif opcode == OP_BRANCH:
+        return {F3_BEQ: ID_BEQ, F3_BNE: ID_BNE, F3_BLT: ID_BLT, F3_BGE: ID_BGE,
+            F3_BLTU: ID_BLTU, F3_BGEU: ID_BGEU}.get(funct3, ID_UNKNOWN)
+    elif opcode == OP_JALR:
+        return ID_JALR if funct3 == F3_JALR else ID_UNKNOWN
+    elif opcode == OP_SYSTEM:
+        # ecall only, other system instructions such as ebreak and csr accesses are not modeled
+        return ID_ECALL if instruction == OP_SYSTEM else ID_UNKNOWN
+    else:
+        return {OP_LUI: ID_LUI, OP_AUIPC: ID_AUIPC, OP_JAL: ID_JAL}.get(opcode, ID_UNKNOWN)
+
+def decode_compressed_instruction_ID(instruction):
+    quadrant = get_bits(instruction, 0, 2)
+    funct3 = get_bits(instruction, 13, 3)
+    if quadrant == 0:
+        if funct3 == F3_C_ADDI4SPN and get_bits(instruction, 5, 8) == 0:
+            # including all-zero instruction
+            return ID_UNKNOWN
+        elif funct3 in (F3_C_LDSP_LD, F3_C_SDSP_SD) and not IS64BITTARGET:
+            return ID_UNKNOWN
+        return {F3_C_ADDI4SPN: ID_C_ADDI4SPN, F3_C_LWSP_LW: ID_C_LW, F3_C_LDSP_LD: ID_C_LD,
+            F3_C_SWSP_SW: ID_C_SW, F3_C_SDSP_SD: ID_C_SD}.get(funct3, ID_UNKNOWN)
+    elif quadrant == 1:
+        if funct3 == F3_C_ADDIW_JAL:
+            return ID_C_ADDIW if IS64BITTARGET else ID_C_JAL
+        elif funct3 == F3_C_LUI_ADDI16SP:
+            return ID_C_ADDI16SP if get_bits(instruction, 7, 5) == REG_SP else ID_C_LUI
+        elif funct3 == F3_C_SRLI_SRAI_ANDI:
+            funct2 = get_bits(instruction, 10, 2)
+            if funct2 == F2_C_SRLI:
+                return ID_C_SRLI
+            elif funct2 == F2_C_SRAI:
+                return ID_C_SRAI
+            elif funct2 == F2_C_ANDI:
+                return ID_C_ANDI
+            elif get_bits(instruction, 10, 6) == F6_C_SUB_XOR_OR_AND:
+                return {F2_C_SUB_SUBW: ID_C_SUB, F2_C_XOR_ADDW: ID_C_XOR,
+                    F2_C_OR: ID_C_OR, F2_C_AND: ID_C_AND}.get(get_bits(instruction, 5, 2), ID_UNKNOWN)
+            else:
+                return {F2_C_SUB_SUBW: ID_C_SUBW, F2_C_XOR_ADDW: ID_C_ADDW}.get(get_bits(instruction, 5, 2), ID_UNKNOWN)
+        return {F3_C_ADDI: ID_C_ADDI, F3_C_LI: ID_C_LI, F3_C_J: ID_C_J,
+            F3_C_BEQZ: ID_C_BEQZ, F3_C_BNEZ: ID_C_BNEZ}.get(funct3, ID_UNKNOWN)
+    else:
+        if funct3 == F3_C_SLLI:
+            return ID_C_SLLI
+        elif get_bits(instruction, 12, 4) in (F4_C_MV_JR, F4_C_ADD_JALR) and get_bits(instruction, 2, 5) == REG_ZR:
+            # jumps through zero register are reserved or ebreak
+            if get_bits(instruction, 7, 5) == REG_ZR:
+                return ID_UNKNOWN
+            return ID_C_JR if get_bits(instruction, 12, 4) == F4_C_MV_JR else ID_C_JALR
+        elif get_bits(instruction, 12, 4) == F4_C_MV_JR:
+            return ID_C_MV
+        elif get_bits(instruction, 12, 4) == F4_C_ADD_JALR:
+            return ID_C_ADD
+        elif funct3 in (F3_C_LDSP_LD, F3_C_SDSP_SD) and not IS64BITTARGET:
+            return ID_UNKNOWN
+        return {F3_C_LWSP_LW: ID_C_LWSP, F3_C_LDSP_LD: ID_C_LDSP,
+            F3_C_SWSP_SW: ID_C_SWSP, F3_C_SDSP_SD: ID_C_SDSP}.get(funct3, ID_UNKNOWN)
+
+def get_instruction_IDs(code):
+    # linear sweep over 32-bit and, with RVC, 16-bit instructions
+    init_instruction_codes()
+    init_compressed_instruction_codes()
+    init_instruction_IDs()
+    init_register_IDs()
+    offset = 0
+    while offset + 2 <= len(code):
+        instruction = int.from_bytes(code[offset:offset + 4], 'little')
+        if get_bits(instruction, 0, 2) == 3:
+            yield offset, decode_instruction_ID(instruction)
+            offset += INSTRUCTIONSIZE
+        elif RVC:
+            yield offset, decode_compressed_instruction_ID(get_bits(instruction, 0, 16))
+            offset += 2
+        else:
+            yield offset, ID_UNKNOWN
+            offset += INSTRUCTIONSIZE
+
+def scan_instruction_IDs(code):
+    return {ID for _, ID in get_instruction_IDs(code)}
+
+def new_instruction_ID(ID):
+    if instruction_IDs is not None and ID not in instruction_IDs:
+        return NID_DISABLED
+    return new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID, RISC_V_MNEMONICS[ID])
+
+def get_modeled_instruction_IDs():
+    # instruction IDs switched to NID_DISABLED by the generator are not modeled
+    return {value for name, value in globals().items() if name.startswith('ID_') and isinstance(value, int)
+        and globals().get(f"N{name}", NID_DISABLED) is not NID_DISABLED}
+
 # instruction IDs
 
 def init_instruction_IDs():
@@ -4582,26 +5988,26 @@ def init_instruction_sorts():
 
     NID_DISABLED = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_UNKNOWN, RISC_V_MNEMONICS[ID_UNKNOWN])
 
-    NID_LUI  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_LUI, RISC_V_MNEMONICS[ID_LUI])
-    NID_ADDI = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_ADDI, RISC_V_MNEMONICS[ID_ADDI])
+    NID_LUI  = new_instruction_ID(ID_LUI)
+    NID_ADDI = new_instruction_ID(ID_ADDI)
 
-    NID_ADD  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_ADD, RISC_V_MNEMONICS[ID_ADD])
-    NID_SUB  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SUB, RISC_V_MNEMONICS[ID_SUB])
-    NID_MUL  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_MUL, RISC_V_MNEMONICS[ID_MUL])
-    NID_DIVU = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_DIVU, RISC_V_MNEMONICS[ID_DIVU])
-    NID_REMU = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_REMU, RISC_V_MNEMONICS[ID_REMU])
-    NID_SLTU = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SLTU, RISC_V_MNEMONICS[ID_SLTU])
+    NID_ADD  = new_instruction_ID(ID_ADD)
+    NID_SUB  = new_instruction_ID(ID_SUB)
+    NID_MUL  = new_instruction_ID(ID_MUL)
+    NID_DIVU = new_instruction_ID(ID_DIVU)
+    NID_REMU = new_instruction_ID(ID_REMU)
+    NID_SLTU = new_instruction_ID(ID_SLTU)
 
-    NID_LW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_LW, RISC_V_MNEMONICS[ID_LW])
-    NID_SW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SW, RISC_V_MNEMONICS[ID_SW])
-    NID_LD = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_LD, RISC_V_MNEMONICS[ID_LD])
-    NID_SD = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SD, RISC_V_MNEMONICS[ID_SD])
+    NID_LW = new_instruction_ID(ID_LW)
+    NID_SW = new_instruction_ID(ID_SW)
+    NID_LD = new_instruction_ID(ID_LD)
+    NID_SD = new_instruction_ID(ID_SD)
 
-    NID_BEQ  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_BEQ, RISC_V_MNEMONICS[ID_BEQ])
-    NID_JAL  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_JAL, RISC_V_MNEMONICS[ID_JAL])
-    NID_JALR = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_JALR, RISC_V_MNEMONICS[ID_JALR])
+    NID_BEQ  = new_instruction_ID(ID_BEQ)
+    NID_JAL  = new_instruction_ID(ID_JAL)
+    NID_JALR = new_instruction_ID(ID_JALR)
 
-    NID_ECALL = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_ECALL, RISC_V_MNEMONICS[ID_ECALL])
+    NID_ECALL = new_instruction_ID(ID_ECALL)
 
     if IS64BITTARGET:
         if RISCUONLY:
@@ -4681,40 +6087,40 @@ def init_instruction_sorts():
         NID_OR  = NID_DISABLED
         NID_AND = NID_DISABLED;
     else:
-        NID_AUIPC = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_AUIPC, RISC_V_MNEMONICS[ID_AUIPC])
+        NID_AUIPC = new_instruction_ID(ID_AUIPC)
 
-        NID_BNE  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_BNE, RISC_V_MNEMONICS[ID_BNE])
-        NID_BLT  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_BLT, RISC_V_MNEMONICS[ID_BLT])
-        NID_BGE  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_BGE, RISC_V_MNEMONICS[ID_BGE])
-        NID_BLTU = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_BLTU, RISC_V_MNEMONICS[ID_BLTU])
-        NID_BGEU = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_BGEU, RISC_V_MNEMONICS[ID_BGEU])
+        NID_BNE  = new_instruction_ID(ID_BNE)
+        NID_BLT  = new_instruction_ID(ID_BLT)
+        NID_BGE  = new_instruction_ID(ID_BGE)
+        NID_BLTU = new_instruction_ID(ID_BLTU)
+        NID_BGEU = new_instruction_ID(ID_BGEU)
 
-        NID_LB  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_LB, RISC_V_MNEMONICS[ID_LB])
-        NID_LH  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_LH, RISC_V_MNEMONICS[ID_LH])
-        NID_LBU = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_LBU, RISC_V_MNEMONICS[ID_LBU])
-        NID_LHU = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_LHU, RISC_V_MNEMONICS[ID_LHU])
+        NID_LB  = new_instruction_ID(ID_LB)
+        NID_LH  = new_instruction_ID(ID_LH)
+        NID_LBU = new_instruction_ID(ID_LBU)
+        NID_LHU = new_instruction_ID(ID_LHU)
 
-        NID_SB = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SB, RISC_V_MNEMONICS[ID_SB])
-        NID_SH = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SH, RISC_V_MNEMONICS[ID_SH])
+        NID_SB = new_instruction_ID(ID_SB)
+        NID_SH = new_instruction_ID(ID_SH)
 
-        NID_SLTI  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SLTI, RISC_V_MNEMONICS[ID_SLTI])
-        NID_SLTIU = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SLTIU, RISC_V_MNEMONICS[ID_SLTIU])
-        NID_XORI  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_XORI, RISC_V_MNEMONICS[ID_XORI])
-        NID_ORI   = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_ORI, RISC_V_MNEMONICS[ID_ORI])
-        NID_ANDI  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_ANDI, RISC_V_MNEMONICS[ID_ANDI])
+        NID_SLTI  = new_instruction_ID(ID_SLTI)
+        NID_SLTIU = new_instruction_ID(ID_SLTIU)
+        NID_XORI  = new_instruction_ID(ID_XORI)
+        NID_ORI   = new_instruction_ID(ID_ORI)
+        NID_ANDI  = new_instruction_ID(ID_ANDI)
 
-        NID_SLLI = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SLLI, RISC_V_MNEMONICS[ID_SLLI])
-        NID_SRLI = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SRLI, RISC_V_MNEMONICS[ID_SRLI])
-        NID_SRAI = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SRAI, RISC_V_MNEMONICS[ID_SRAI])
+        NID_SLLI = new_instruction_ID(ID_SLLI)
+        NID_SRLI = new_instruction_ID(ID_SRLI)
+        NID_SRAI = new_instruction_ID(ID_SRAI)
 
-        NID_SLL = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SLL, RISC_V_MNEMONICS[ID_SLL])
-        NID_SLT = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SLT, RISC_V_MNEMONICS[ID_SLT])
-        NID_XOR = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_XOR, RISC_V_MNEMONICS[ID_XOR])
-        NID_SRL = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SRL, RISC_V_MNEMONICS[ID_SRL])
-        NID_SRA = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SRA, RISC_V_MNEMONICS[ID_SRA])
+        NID_SLL = new_instruction_ID(ID_SLL)
+        NID_SLT = new_instruction_ID(ID_SLT)
+        NID_XOR = new_instruction_ID(ID_XOR)
+        NID_SRL = new_instruction_ID(ID_SRL)
+        NID_SRA = new_instruction_ID(ID_SRA)
 
-        NID_OR  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_OR, RISC_V_MNEMONICS[ID_OR])
-        NID_AND = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_AND, RISC_V_MNEMONICS[ID_AND])
+        NID_OR  = new_instruction_ID(ID_OR)
+        NID_AND = new_instruction_ID(ID_AND)
 
     # RV64I codes missing in RISC-U
 
@@ -4745,18 +6151,18 @@ def init_instruction_sorts():
 
     if not RISCUONLY:
         if IS64BITTARGET:
-            NID_LWU = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_LWU, RISC_V_MNEMONICS[ID_LWU])
+            NID_LWU = new_instruction_ID(ID_LWU)
 
-            NID_ADDIW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_ADDIW, RISC_V_MNEMONICS[ID_ADDIW])
-            NID_SLLIW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SLLIW, RISC_V_MNEMONICS[ID_SLLIW])
-            NID_SRLIW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SRLIW, RISC_V_MNEMONICS[ID_SRLIW])
-            NID_SRAIW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SRAIW, RISC_V_MNEMONICS[ID_SRAIW])
+            NID_ADDIW = new_instruction_ID(ID_ADDIW)
+            NID_SLLIW = new_instruction_ID(ID_SLLIW)
+            NID_SRLIW = new_instruction_ID(ID_SRLIW)
+            NID_SRAIW = new_instruction_ID(ID_SRAIW)
 
-            NID_ADDW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_ADDW, RISC_V_MNEMONICS[ID_ADDW])
-            NID_SUBW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SUBW, RISC_V_MNEMONICS[ID_SUBW])
-            NID_SLLW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SLLW, RISC_V_MNEMONICS[ID_SLLW])
-            NID_SRLW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SRLW, RISC_V_MNEMONICS[ID_SRLW])
-            NID_SRAW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_SRAW, RISC_V_MNEMONICS[ID_SRAW])
+            NID_ADDW = new_instruction_ID(ID_ADDW)
+            NID_SUBW = new_instruction_ID(ID_SUBW)
+            NID_SLLW = new_instruction_ID(ID_SLLW)
+            NID_SRLW = new_instruction_ID(ID_SRLW)
+            NID_SRAW = new_instruction_ID(ID_SRAW)
 
     # RV32M codes missing in RISC-U
 
@@ -4780,11 +6186,11 @@ def init_instruction_sorts():
     if not RISCUONLY:
         if RV32M:
             # MUL, DIVU, REMU already defined
-            NID_MULH   = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_MULH, RISC_V_MNEMONICS[ID_MULH])
-            NID_MULHSU = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_MULHSU, RISC_V_MNEMONICS[ID_MULHSU])
-            NID_MULHU  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_MULHU, RISC_V_MNEMONICS[ID_MULHU])
-            NID_DIV    = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_DIV, RISC_V_MNEMONICS[ID_DIV])
-            NID_REM    = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_REM, RISC_V_MNEMONICS[ID_REM])
+            NID_MULH   = new_instruction_ID(ID_MULH)
+            NID_MULHSU = new_instruction_ID(ID_MULHSU)
+            NID_MULHU  = new_instruction_ID(ID_MULHU)
+            NID_DIV    = new_instruction_ID(ID_DIV)
+            NID_REM    = new_instruction_ID(ID_REM)
         else:
             NID_MUL  = NID_DISABLED
             NID_DIVU = NID_DISABLED
@@ -4799,11 +6205,11 @@ def init_instruction_sorts():
         RV64M = False
 
     if RV64M:
-        NID_MULW  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_MULW, RISC_V_MNEMONICS[ID_MULW])
-        NID_DIVW  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_DIVW, RISC_V_MNEMONICS[ID_DIVW])
-        NID_DIVUW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_DIVUW, RISC_V_MNEMONICS[ID_DIVUW])
-        NID_REMW  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_REMW, RISC_V_MNEMONICS[ID_REMW])
-        NID_REMUW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_REMUW, RISC_V_MNEMONICS[ID_REMUW])
+        NID_MULW  = new_instruction_ID(ID_MULW)
+        NID_DIVW  = new_instruction_ID(ID_DIVW)
+        NID_DIVUW = new_instruction_ID(ID_DIVUW)
+        NID_REMW  = new_instruction_ID(ID_REMW)
+        NID_REMUW = new_instruction_ID(ID_REMUW)
     else:
         NID_MULW  = NID_DISABLED
         NID_DIVW  = NID_DISABLED
@@ -5071,51 +6477,51 @@ def init_compressed_instruction_sorts():
         # avoiding oversized then case
         return
 
-    NID_C_LI  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_LI, RISC_V_MNEMONICS[ID_C_LI])
-    NID_C_LUI = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_LUI, RISC_V_MNEMONICS[ID_C_LUI])
+    NID_C_LI  = new_instruction_ID(ID_C_LI)
+    NID_C_LUI = new_instruction_ID(ID_C_LUI)
 
-    NID_C_ADDI = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_ADDI, RISC_V_MNEMONICS[ID_C_ADDI])
+    NID_C_ADDI = new_instruction_ID(ID_C_ADDI)
     if IS64BITTARGET:
-        NID_C_ADDIW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_ADDIW, RISC_V_MNEMONICS[ID_C_ADDIW])
+        NID_C_ADDIW = new_instruction_ID(ID_C_ADDIW)
     else:
         NID_C_ADDIW = NID_DISABLED
-    NID_C_ADDI16SP = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_ADDI16SP, RISC_V_MNEMONICS[ID_C_ADDI16SP])
+    NID_C_ADDI16SP = new_instruction_ID(ID_C_ADDI16SP)
 
-    NID_C_ADDI4SPN = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_ADDI4SPN, RISC_V_MNEMONICS[ID_C_ADDI4SPN])
+    NID_C_ADDI4SPN = new_instruction_ID(ID_C_ADDI4SPN)
 
-    NID_C_ANDI = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_ANDI, RISC_V_MNEMONICS[ID_C_ANDI])
+    NID_C_ANDI = new_instruction_ID(ID_C_ANDI)
 
-    NID_C_SLLI = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_SLLI, RISC_V_MNEMONICS[ID_C_SLLI])
-    NID_C_SRLI = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_SRLI, RISC_V_MNEMONICS[ID_C_SRLI])
-    NID_C_SRAI = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_SRAI, RISC_V_MNEMONICS[ID_C_SRAI])
+    NID_C_SLLI = new_instruction_ID(ID_C_SLLI)
+    NID_C_SRLI = new_instruction_ID(ID_C_SRLI)
+    NID_C_SRAI = new_instruction_ID(ID_C_SRAI)
 
-    NID_C_MV  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_MV, RISC_V_MNEMONICS[ID_C_MV])
-    NID_C_ADD = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_ADD, RISC_V_MNEMONICS[ID_C_ADD])
+    NID_C_MV  = new_instruction_ID(ID_C_MV)
+    NID_C_ADD = new_instruction_ID(ID_C_ADD)
 
-    NID_C_SUB = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_SUB, RISC_V_MNEMONICS[ID_C_SUB])
-    NID_C_XOR = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_XOR, RISC_V_MNEMONICS[ID_C_XOR])
-    NID_C_OR  = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_OR, RISC_V_MNEMONICS[ID_C_OR])
-    NID_C_AND = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_AND, RISC_V_MNEMONICS[ID_C_AND])
+    NID_C_SUB = new_instruction_ID(ID_C_SUB)
+    NID_C_XOR = new_instruction_ID(ID_C_XOR)
+    NID_C_OR  = new_instruction_ID(ID_C_OR)
+    NID_C_AND = new_instruction_ID(ID_C_AND)
 
     if IS64BITTARGET:
-        NID_C_ADDW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_ADDW, RISC_V_MNEMONICS[ID_C_ADDW])
-        NID_C_SUBW = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_SUBW, RISC_V_MNEMONICS[ID_C_SUBW])
+        NID_C_ADDW = new_instruction_ID(ID_C_ADDW)
+        NID_C_SUBW = new_instruction_ID(ID_C_SUBW)
     else:
         NID_C_ADDW = NID_DISABLED
         NID_C_SUBW = NID_DISABLED
 
-    NID_C_LWSP = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_LWSP, RISC_V_MNEMONICS[ID_C_LWSP])
-    NID_C_LW   = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_LW, RISC_V_MNEMONICS[ID_C_LW])
+    NID_C_LWSP = new_instruction_ID(ID_C_LWSP)
+    NID_C_LW   = new_instruction_ID(ID_C_LW)
 
-    NID_C_SWSP = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_SWSP, RISC_V_MNEMONICS[ID_C_SWSP])
-    NID_C_SW   = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_SW, RISC_V_MNEMONICS[ID_C_SW])
+    NID_C_SWSP = new_instruction_ID(ID_C_SWSP)
+    NID_C_SW   = new_instruction_ID(ID_C_SW)
 
     if IS64BITTARGET:
-        NID_C_LDSP = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_LDSP, RISC_V_MNEMONICS[ID_C_LDSP])
-        NID_C_LD   = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_LD, RISC_V_MNEMONICS[ID_C_LD])
+        NID_C_LDSP = new_instruction_ID(ID_C_LDSP)
+        NID_C_LD   = new_instruction_ID(ID_C_LD)
 
-        NID_C_SDSP = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_SDSP, RISC_V_MNEMONICS[ID_C_SDSP])
-        NID_C_SD   = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_SD, RISC_V_MNEMONICS[ID_C_SD])
+        NID_C_SDSP = new_instruction_ID(ID_C_SDSP)
+        NID_C_SD   = new_instruction_ID(ID_C_SD)
     else:
         NID_C_LDSP = NID_DISABLED
         NID_C_LD   = NID_DISABLED
@@ -5123,29 +6529,33 @@ def init_compressed_instruction_sorts():
         NID_C_SDSP = NID_DISABLED
         NID_C_SD   = NID_DISABLED
 
-    NID_C_BEQZ = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_BEQZ, RISC_V_MNEMONICS[ID_C_BEQZ])
-    NID_C_BNEZ = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_BNEZ, RISC_V_MNEMONICS[ID_C_BNEZ])
+    NID_C_BEQZ = new_instruction_ID(ID_C_BEQZ)
+    NID_C_BNEZ = new_instruction_ID(ID_C_BNEZ)
 
-    NID_C_J = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_J, RISC_V_MNEMONICS[ID_C_J])
+    NID_C_J = new_instruction_ID(ID_C_J)
     if IS64BITTARGET:
         NID_C_JAL = NID_DISABLED
     else:
-        NID_C_JAL = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_JAL, RISC_V_MNEMONICS[ID_C_JAL])
+        NID_C_JAL = new_instruction_ID(ID_C_JAL)
 
-    NID_C_JR   = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_JR, RISC_V_MNEMONICS[ID_C_JR])
-    NID_C_JALR = new_constant(OP_CONSTD, SID_INSTRUCTION_ID, ID_C_JALR, RISC_V_MNEMONICS[ID_C_JALR])
+    NID_C_JR   = new_instruction_ID(ID_C_JR)
+    NID_C_JALR = new_instruction_ID(ID_C_JALR)
 
 # system model
 
 class Bitvector_State:
-    def __init__(self, core, sid, name, initials):
+    def __init__(self, core, sid, name, initials, initial_value = 0):
         assert isinstance(sid, Bitvector), f"got {sid} but expected bitvector"
         self.sid = sid
+        if initial_value != 0:
+            self.initial = new_constant(OP_CONSTH, self.sid, initial_value, f"entry {name} value")
         if core >= 0:
-            self.initial = new_constant(OP_CONSTD, self.sid, 0, f"initial core-{core} {name} value")
+            if initial_value == 0:
+                self.initial = new_constant(OP_CONSTD, self.sid, 0, f"initial core-{core} {name} value")
             self.state = new_input(OP_STATE, self.sid, f"core-{core}-{initials}", f"{sid.size}-bit {name}")
         else:
-            self.initial = new_constant(OP_CONSTD, self.sid, 0, f"initial {name} value")
+            if initial_value == 0:
+                self.initial = new_constant(OP_CONSTD, self.sid, 0, f"initial {name} value")
             self.state = new_input(OP_STATE, self.sid, f"{initials}", f"{sid.size}-bit {name}")
         self.init = new_init(self.sid, self.state, self.initial, f"initializing {name}")
 
@@ -5169,24 +6579,57 @@ class Array_State:
 
 class PC(Bitvector_State):
     def __init__(self, core):
-        super().__init__(core, SID_MACHINE_WORD, "program counter", 'pc')
+        super().__init__(core, SID_MACHINE_WORD, "program counter", 'pc', entry_point)
 
 class Registers(Array_State):
     def __init__(self, core):
         super().__init__(core, SID_REGISTER_STATE, "register file", 'register-file')
 
 class Segment(Array_State):
-    def __init__(self, core, array_sid, start_nid, end_nid, name, initials):
+    LOAD_CHUNK_SIZE = 256 # maximum number of words loaded into one read-only state
+
+    def __init__(self, core, array_sid, start_nid, end_nid, name, initials, contents = b'', read_only = False):
         assert isinstance(array_sid, Array) and isinstance(start_nid, Constant) and isinstance(end_nid, Constant)
         super().__init__(core, array_sid, name, initials)
         self.start_nid = start_nid
         self.end_nid = end_nid
+        if contents:
+            self.load(core, contents, name, initials, read_only)
+
+    def load(self, core, contents, name, initials, read_only):
+        # chain of read-only states initialized with chunks of writes over the zeroed segment
+        word_size = self.array_sid.element_size_line.size // 8
+        words = [(index, word) for index, word in
+            enumerate(struct.iter_unpack(f"<{'Q' if word_size == 8 else 'I'}",
+                contents + bytes(-len(contents) % word_size)))
+            if word[0] != 0]
+        value_nids = {}
+        chunks = range(0, len(words), Segment.LOAD_CHUNK_SIZE)
+        if len(chunks) > 0:
+            new_next(self.array_sid, self.state, self.state, f"read-only zeroed {name}")
+        for chunk in chunks:
+            value_nid = self.state
+            for index, (word,) in words[chunk:chunk + Segment.LOAD_CHUNK_SIZE]:
+                if word not in value_nids:
+                    value_nids[word] = new_constant(OP_CONSTH, self.array_sid.element_size_line, word,
+                        f"{name} word 0x{word:X}")
+                value_nid = new_ternary(OP_WRITE, self.array_sid, value_nid,
+                    new_constant(OP_CONSTD, self.array_sid.array_size_line, index, f"{name} index {index}"),
+                    value_nids[word], f"loading {name} word at index {index}")
+            self.state = new_input(OP_STATE, self.array_sid,
+                f"{f'core-{core}-' if core >= 0 else ''}loaded-{initials}-{chunk // Segment.LOAD_CHUNK_SIZE}",
+                f"loaded {name} chunk {chunk // Segment.LOAD_CHUNK_SIZE}")
+            self.init = new_init(self.array_sid, self.state, value_nid, f"loading {name} chunk {chunk // Segment.LOAD_CHUNK_SIZE}")
+            if read_only or chunk + Segment.LOAD_CHUNK_SIZE < len(words):
+                new_next(self.array_sid, self.state, self.state, f"read-only loaded {name}")
 
 class Memory:
     def __init__(self, core):
         self.vaddr_sort_nid = SID_VIRTUAL_ADDRESS
-        self.code = Segment(core, SID_CODE_STATE, NID_CODE_START, NID_CODE_END, "code segment", 'code-segment')
-        self.data = Segment(core, SID_DATA_STATE, NID_DATA_START, NID_DATA_END, "data segment", 'data-segment')
+        self.code = Segment(core, SID_CODE_STATE, NID_CODE_START, NID_CODE_END, "code segment", 'code-segment',
+            code_binary, True)
+        self.data = Segment(core, SID_DATA_STATE, NID_DATA_START, NID_DATA_END, "data segment", 'data-segment',
+            data_binary)
         self.heap = Segment(core, SID_HEAP_STATE, NID_HEAP_START, NID_HEAP_END, "heap segment", 'heap-segment')
         self.stack = Segment(core, SID_STACK_STATE, NID_STACK_START, NID_STACK_END, "stack segment", 'stack-segment')
 
@@ -5194,42 +6637,92 @@ class Memory:
         return f"{self.vaddr_sort_nid.size}-bit virtual memory:\n{self.code}\n{self.data}\n{self.heap}\n{self.stack}"
 
 class Kernel:
-    def __init__(self, core, memory):
+    # kernel state shared by all cores
+    def __init__(self, memory):
         assert isinstance(memory, Memory), f"got {memory} but expected memory"
         self.memory = memory
         self.program_break = Bitvector_State(-1, memory.vaddr_sort_nid, "program break", 'program-break')
         self.file_descriptor = Bitvector_State(-1, SID_MACHINE_WORD, "file descriptor", 'file-descriptor')
         self.input_buffer = Array_State(-1, SID_INPUT_BUFFER, "input buffer", 'input-buffer')
-        self.readable_bytes = Bitvector_State(core, SID_MACHINE_WORD, "readable bytes", 'readable-bytes')
-        self.read_bytes = Bitvector_State(core, SID_MACHINE_WORD, "read bytes", 'read-bytes')
 
     def __str__(self):
-        return f"kernel:\n{self.program_break}\n{self.file_descriptor}\n{self.input_buffer}\n{self.readable_bytes}\n{self.read_bytes}"
+        return f"kernel:\n{self.program_break}\n{self.file_descriptor}\n{self.input_buffer}"
 
 class Core:
     cores = {}
 
-    def __init__(self):
+    def __init__(self, system):
+        assert isinstance(system, System), f"got {system} but expected system"
         self.core = len(Core.cores)
-        self.memory = Memory(self.core)
-        self.kernel = Kernel(self.core, self.memory)
+        self.memory = system.memory
+        self.kernel = system.kernel
+        self.readable_bytes = Bitvector_State(self.core, SID_MACHINE_WORD, "readable bytes", 'readable-bytes')
+        self.read_bytes = Bitvector_State(self.core, SID_MACHINE_WORD, "read bytes", 'read-bytes')
         self.pc = PC(self.core)
         self.regs = Registers(self.core)
+        if system.scheduler is None:
+            self.active = NID_TRUE
+        else:
+            self.active = new_binary_boolean(OP_EQ, system.scheduler,
+                new_constant(OP_CONSTD, system.scheduler.sid_line, self.core, f"core {self.core}"),
+                f"core-{self.core} is active")
         self.new_core()
 
+        if instruction_IDs is not None:
+            self.new_illegal_instruction()
+
     def __str__(self):
-        return f"{self.kernel}\n{self.memory}\ncore-{self.core}:\n{self.pc}\n{self.regs}"
+        return f"core-{self.core}:\n{self.readable_bytes}\n{self.read_bytes}\n{self.pc}\n{self.regs}"
 
     def new_core(self):
         assert self.core not in Core.cores, f"{self.core} already defined"
         Core.cores[self.core] = self
 
+    def new_illegal_instruction(self):
+        # decoder-free: pc at loaded instructions that are unknown or not modeled
+        modeled_IDs = get_modeled_instruction_IDs()
+        is_illegal = NID_FALSE
+        for offset, ID in get_instruction_IDs(code_binary):
+            if ID not in modeled_IDs:
+                is_illegal = new_binary_boolean(OP_OR, is_illegal,
+                    new_binary_boolean(OP_EQ, self.pc.state,
+                        new_constant(OP_CONSTH, SID_MACHINE_WORD, code_start + offset,
+                            f"address of {RISC_V_MNEMONICS[ID]}"),
+                        f"core-{self.core} pc at {RISC_V_MNEMONICS[ID]}"),
+                    f"core-{self.core} pc at illegal instruction")
+        if self.active is not NID_TRUE:
+            # only the active core executes, per-core transitions must be gated likewise
+            is_illegal = new_binary_boolean(OP_AND, self.active, is_illegal,
+                f"core-{self.core} active at illegal instruction")
+        self.illegal_instruction = new_property(OP_BAD, is_illegal,
+            f"core-{self.core}-illegal-instruction", f"core-{self.core} illegal or unsupported instruction")
+
 class System:
-    def __init__(self):
-        self.core = Core() # single core for now
+    CORES = 1 # number of cores sharing memory and kernel
+
+    def __init__(self, number_of_cores = None):
+        if number_of_cores is None:
+            number_of_cores = System.CORES
+        assert number_of_cores > 0
+        # single-core memory keeps core-specific names
+        self.memory = Memory(0 if number_of_cores == 1 else -1)
+        self.kernel = Kernel(self.memory)
+        if number_of_cores > 1:
+            # scheduler input selects the active core in each step
+            size = max(1, math.ceil(math.log2(number_of_cores)))
+            self.scheduler = new_input(OP_INPUT, new_bitvec(size, f"{size}-bit core ID"),
+                'core-scheduler', "active core")
+            if number_of_cores < 2**size:
+                new_property(OP_CONSTRAINT, new_binary_boolean(OP_ULT, self.scheduler,
+                    new_constant(OP_CONSTD, self.scheduler.sid_line, number_of_cores, f"{number_of_cores} cores"),
+                    "scheduled core exists"), 'core-scheduler-bound', "scheduling existing cores only")
+        else:
+            self.scheduler = None
+        self.cores = [Core(self) for _ in range(number_of_cores)]
 
     def __str__(self):
-        return f"{SID_MACHINE_WORD.size}-bit single-core system:\n{self.core}"
+        cores = '\n'.join(str(core) for core in self.cores)
+        return f"{SID_MACHINE_WORD.size}-bit {len(self.cores)}-core system:\n{self.kernel}\n{self.memory}\n{cores}"
 
 # console output
 
@@ -5485,13 +6978,27 @@ def parse_btor2_line(line, line_no):
             raise syntax_error("nid", line_no)
     return line.strip()
 
+# wall-clock times at start of parsing, after parsing lines, and after mapping arrays
+parse_times = []
+
 def parse_btor2(modelfile, outputfile):
     print_separator('#')
     print(f"model file: {modelfile.name}")
 
+    parse_times.clear()
+    parse_times.append(time.perf_counter())
+
+    Obligations.new_digest()
+
+    if Array.DERIVE_SIZE_BOUND:
+        modelfile = modelfile.readlines()
+        Array.ARRAY_SIZE_BOUND = Array.derive_array_size_bound(modelfile)
+
     lines = {}
     line_no = 1
     for line in modelfile:
+        if Obligations.digest is not None:
+            Obligations.digest.update(line.encode())
         try:
             lines[line_no] = parse_btor2_line(line, line_no)
             line_no += 1
@@ -5499,9 +7006,13 @@ def parse_btor2(modelfile, outputfile):
             print(f"parsing exception: {message}")
             exit(1)
 
+    parse_times.append(time.perf_counter())
+
     # start: mapping arrays to bitvectors
 
-    if Array.ARRAY_SIZE_BOUND > 0:
+    if Array.ARRAY_SIZE_BOUND > 0 or Read.READ_OVER_WRITE or Lookup.LOOKUP_TABLES:
+        Array.new_mapped_array_elements()
+
         for init in Init.inits.values():
             init.set_mapped_array_expression()
         for constraint in Constraint.constraints.values():
@@ -5526,6 +7037,8 @@ def parse_btor2(modelfile, outputfile):
 
     # end: mapping arrays to bitvectors
 
+    parse_times.append(time.perf_counter())
+
     for state in State.states.values():
         if state.init_line is None:
             # state has no init
@@ -5581,12 +7094,32 @@ def parse_btor2(modelfile, outputfile):
     print(f"{Implies.count} implies, {Comparison.count} comparison, {Logical.count} logical, {Computation.count} computation")
     print(f"{Concat.count} concat, {Ite.count} ite, {Read.count} read, {Write.count} write")
 
-    if Array.ARRAY_SIZE_BOUND > 0:
+    if Array.ARRAY_SIZE_BOUND > 0 or Read.READ_OVER_WRITE or Lookup.LOOKUP_TABLES:
         print("array mapping profile:")
         print(f"out of {Array.number_of_variable_arrays} arrays {Array.number_of_mapped_arrays} mapped")
+        print(f"{Array.number_of_sparse_arrays} sparse arrays, {Array.number_of_mapped_elements} mapped elements")
+        for array_encoding in Array.array_encodings.values():
+            print(array_encoding)
+        if Read.READ_OVER_WRITE:
+            print(f"{Read.number_of_reads_over_writes} reads over writes, {Write.number_of_collapsed_writes} collapsed writes")
+        if Lookup.LOOKUP_TABLES:
+            print(f"{len(Lookup.tables)} lookup tables, {Lookup.number_of_lookups} lookups")
         print(f"{Expression.total_number_of_generated_expressions} generated expressions")
         Expression.total_number_of_generated_expressions = 0
 
+    if Sweep.SWEEP:
+        Sweep.sweep()
+        print("sweeping profile:")
+        print(f"{Sweep.number_of_hashed_nodes} structurally hashed expressions")
+        print(f"{Sweep.number_of_candidates} candidates: {Sweep.number_of_merges} merged, {Sweep.number_of_refutations} refuted, {Sweep.number_of_timeouts} timed out")
+        print(f"{Sweep.number_of_nodes} expressions reduced to {Sweep.number_of_swept_nodes} in {Sweep.sweeping_seconds:.2f} seconds")
+
+    if Ternary_Simulation.STEPS is not None:
+        Ternary_Simulation.simulate()
+        print("ternary simulation profile:")
+        print(f"out of {Ternary_Simulation.number_of_state_bits} state bits")
+        print(f"{Ternary_Simulation.number_of_step_constant_bits} constant for {Ternary_Simulation.STEPS} steps, {Ternary_Simulation.number_of_invariant_bits} constant forever")
+
     if outputfile:
         print_separator('-')
         print(f"output file: {outputfile.name}")
@@ -5610,6 +7143,7 @@ class Solver:
 class Z3_Solver(Solver):
     def __init__(self):
         super().__init__(z3.Solver())
+        self.activations = {}
 
     def assert_this(self, assertions, step):
         for assertion in assertions:
@@ -5619,6 +7153,21 @@ class Z3_Solver(Solver):
         for assertion in assertions:
             self.solver.add(assertion.get_z3_step(step) == False)
 
+    def get_activation(self, state):
+        if state not in self.activations:
+            self.activations[state] = z3.Bool(f"visible-{state.name}")
+        return self.activations[state]
+
+    def assert_activated(self, assertions, step, activation):
+        for assertion in assertions:
+            self.solver.add(z3.Implies(activation, assertion.get_z3_step(step)))
+
+    def prove_activated(self, activations):
+        return self.solver.check(*activations)
+
+    def is_satisfied(self, assertion, step):
+        return z3.is_true(self.solver.model().evaluate(assertion.get_z3_step(step), model_completion=True))
+
     def simplify(self):
         # no effective simplification yet found in Z3
         return self
@@ -5635,6 +7184,14 @@ class Z3_Solver(Solver):
     def assert_is_state_changing(self, next_line, step):
         return self.solver.add(next_line.get_z3_is_state_changing(step))
 
+    def assert_is_any_state_changing(self, next_lines, step):
+        return self.solver.add(z3.Or([next_line.get_z3_is_state_changing(step) for next_line in next_lines]))
+
+    def get_changing_states(self, next_lines, step):
+        model = self.solver.model()
+        return [next_line for next_line in next_lines
+            if z3.is_true(model.evaluate(next_line.get_z3_is_state_changing(step), model_completion=True))]
+
     def assert_state_is_not_changing(self, next_line, step):
         return self.solver.add(next_line.get_z3_state_is_not_changing(step))
 
@@ -5645,6 +7202,18 @@ class Z3_Solver(Solver):
         print_message("%s = 0x%X\n" % (pc.get_z3_name(step),
             int(model.evaluate(pc.get_z3_instance(step - 1)).as_long())), step, level)
 
+    def prove_defaults(self, inputs):
+        # assuming bitvector inputs are zero
+        return self.solver.check(*[z3.Not(input_variable.get_z3()) if isinstance(input_variable.sid_line, Bool)
+            else input_variable.get_z3() == 0 for input_variable in inputs])
+
+    def get_input_values(self, inputs):
+        return Sweep.get_counterexample(self.solver.model(), inputs)
+
+    def block_inputs(self, cube):
+        self.solver.add(z3.Or([input_variable.get_z3() != (z3.BoolVal(value == 1)
+            if isinstance(input_variable.sid_line, Bool) else value) for input_variable, value in cube.items()]))
+
     def print_inputs(self, inputs, step, level):
         model = self.solver.model()
         for input_variable in inputs.values():
@@ -5654,11 +7223,17 @@ class Z3_Solver(Solver):
                 model.evaluate(input_variable.get_z3_instance(step - 1))), step, level)
 
 class Bitwuzla_Solver(Solver):
+    # terms cached in lines must be created by the same term manager
+    term_manager = None
+
     def __init__(self):
-        self.tm = bitwuzla.TermManager()
+        if Bitwuzla_Solver.term_manager is None:
+            Bitwuzla_Solver.term_manager = bitwuzla.TermManager()
+        self.tm = Bitwuzla_Solver.term_manager
         self.options = bitwuzla.Options()
         self.options.set(bitwuzla.Option.PRODUCE_MODELS, True)
         super().__init__(bitwuzla.Bitwuzla(self.tm, self.options))
+        self.activations = {}
 
     def assert_this(self, assertions, step):
         for assertion in assertions:
@@ -5668,6 +7243,22 @@ class Bitwuzla_Solver(Solver):
         for assertion in assertions:
             self.solver.assert_formula(self.tm.mk_term(bitwuzla.Kind.NOT, [assertion.get_bitwuzla_step(step, self.tm)]))
 
+    def get_activation(self, state):
+        if state not in self.activations:
+            self.activations[state] = self.tm.mk_const(self.tm.mk_bool_sort(), f"visible-{state.name}")
+        return self.activations[state]
+
+    def assert_activated(self, assertions, step, activation):
+        for assertion in assertions:
+            self.solver.assert_formula(self.tm.mk_term(bitwuzla.Kind.IMPLIES,
+                [activation, assertion.get_bitwuzla_step(step, self.tm)]))
+
+    def prove_activated(self, activations):
+        return self.solver.check_sat(*activations)
+
+    def is_satisfied(self, assertion, step):
+        return self.solver.get_value(assertion.get_bitwuzla_step(step, self.tm)).is_true()
+
     def simplify(self):
         # possibly increases performance
         return self.prove()
@@ -5684,6 +7275,17 @@ class Bitwuzla_Solver(Solver):
     def assert_is_state_changing(self, next_line, step):
         return self.solver.assert_formula(next_line.get_bitwuzla_is_state_changing(step, self.tm))
 
+    def assert_is_any_state_changing(self, next_lines, step):
+        is_state_changing = [next_line.get_bitwuzla_is_state_changing(step, self.tm) for next_line in next_lines]
+        if len(is_state_changing) > 1:
+            return self.solver.assert_formula(self.tm.mk_term(bitwuzla.Kind.OR, is_state_changing))
+        else:
+            return self.solver.assert_formula(*is_state_changing)
+
+    def get_changing_states(self, next_lines, step):
+        return [next_line for next_line in next_lines
+            if self.solver.get_value(next_line.get_bitwuzla_is_state_changing(step, self.tm)).is_true()]
+
     def assert_state_is_not_changing(self, next_line, step):
         return self.solver.assert_formula(next_line.get_bitwuzla_state_is_not_changing(step, self.tm))
 
@@ -5693,6 +7295,49 @@ class Bitwuzla_Solver(Solver):
         print_message(f"{pc}\n", step, level)
         print_message("%s = 0x%X\n" % (pc.get_bitwuzla_name(step, self.tm), pc_value), step, level)
 
+    def prove_defaults(self, inputs):
+        # assuming bitvector inputs are zero, without unsat assumptions which break constant arrays
+        return self.solver.check_sat(*[self.tm.mk_term(bitwuzla.Kind.NOT, [input_variable.get_bitwuzla(self.tm)])
+            if isinstance(input_variable.sid_line, Bool) else self.tm.mk_term(bitwuzla.Kind.EQUAL,
+                [input_variable.get_bitwuzla(self.tm), self.tm.mk_bv_value(input_variable.sid_line.get_bitwuzla(self.tm), 0)])
+            for input_variable in inputs])
+
+    def get_array_value(self, value, sid_line):
+        # array values other than constant arrays with stores remain unknown
+        elements = {}
+        while value.kind() is bitwuzla.Kind.ARRAY_STORE:
+            array, index, element = value.children()
+            elements.setdefault(int(index.value(10)),
+                Ternary_Simulation.known(int(element.value(10)), sid_line.element_size_line.size))
+            value = array
+        if value.kind() is bitwuzla.Kind.CONST_ARRAY:
+            return Ternary_Array(Ternary_Simulation.known(int(value.children()[0].value(10)),
+                sid_line.element_size_line.size), elements)
+        else:
+            return Ternary_Array(Ternary_Simulation.unknown())
+
+    def get_input_values(self, inputs):
+        values = {}
+        for input_variable in inputs:
+            value = self.solver.get_value(input_variable.get_bitwuzla(self.tm))
+            if isinstance(input_variable.sid_line, Array):
+                values[input_variable] = self.get_array_value(value, input_variable.sid_line)
+            elif isinstance(input_variable.sid_line, Bool):
+                values[input_variable] = Ternary_Simulation.known(int(value.value()), 1)
+            else:
+                values[input_variable] = Ternary_Simulation.known(int(value.value(10)), input_variable.sid_line.size)
+        return values
+
+    def block_inputs(self, cube):
+        distinct = [self.tm.mk_term(bitwuzla.Kind.DISTINCT, [input_variable.get_bitwuzla(self.tm),
+            (self.tm.mk_true() if value == 1 else self.tm.mk_false()) if isinstance(input_variable.sid_line, Bool)
+                else self.tm.mk_bv_value(input_variable.sid_line.get_bitwuzla(self.tm), value)])
+            for input_variable, value in cube.items()]
+        if len(distinct) > 1:
+            self.solver.assert_formula(self.tm.mk_term(bitwuzla.Kind.OR, distinct))
+        else:
+            self.solver.assert_formula(*distinct)
+
     def print_inputs(self, inputs, step, level):
         for input_variable in inputs.values():
             # only print value of uninitialized states
@@ -5701,8 +7346,221 @@ class Bitwuzla_Solver(Solver):
                 self.solver.get_value(input_variable.get_bitwuzla_instance(step - 1, self.tm))),
                 step, level)
 
+# witness minimization
+
+class Witness:
+    # inputs of counterexamples are set to zero one at a time and only kept if
+    # the solver, or for arrays concrete replay, no longer reaches the bad property
+
+    MINIMIZE = False
+
+    number_of_witness_inputs = 0
+    number_of_essential_inputs = 0
+
+    def get_default(sid_line):
+        if isinstance(sid_line, Array):
+            return Ternary_Array(Ternary_Simulation.known(0, sid_line.element_size_line.size))
+        else:
+            return Ternary_Simulation.known(0, sid_line.size)
+
+    def get_initial_values(witness):
+        cache = {}
+        values = dict(witness)
+        for state in State.states.values():
+            if state.init_line is not None:
+                value = state.init_line.exp_line.get_ternary(witness, cache)
+                if isinstance(state.sid_line, Array) and not isinstance(value, Ternary_Array):
+                    value = Ternary_Array(value)
+                values[state] = value
+        return values
+
+    def replay(bad, step, witness, negated_bads = ()):
+        # ternary simulation is concrete on known inputs if all array elements are tracked
+        array_size_bound = Ternary_Simulation.ARRAY_SIZE_BOUND
+        Ternary_Simulation.ARRAY_SIZE_BOUND = math.inf
+        try:
+            values = Witness.get_initial_values(witness)
+            for current_step in range(step + 1):
+                cache = {}
+                for constraint in Constraint.constraints.values():
+                    if not Ternary_Simulation.is_true(constraint.property_line.get_ternary(values, cache)):
+                        return False
+                if current_step == step:
+                    return Ternary_Simulation.is_true(bad.property_line.get_ternary(values, cache))
+                for negated_bad in negated_bads:
+                    if not Ternary_Simulation.is_false(negated_bad.property_line.get_ternary(values, cache)):
+                        return False
+                next_values = dict(witness)
+                for state in State.states.values():
+                    if state.next_line is not None:
+                        next_values[state] = state.next_line.exp_line.get_ternary(values, cache)
+                    elif state in values:
+                        next_values[state] = values[state]
+                values = next_values
+        finally:
+            Ternary_Simulation.ARRAY_SIZE_BOUND = array_size_bound
+
+    def get_defaults(solver, inputs):
+        # other inputs may change when dropping an input
+        if solver.is_SAT(solver.prove_defaults(inputs)):
+            return inputs
+        defaults = []
+        is_model_current = False
+        for input_variable in inputs:
+            is_model_current = solver.is_SAT(solver.prove_defaults([*defaults, input_variable]))
+            if is_model_current:
+                defaults.append(input_variable)
+        if not is_model_current:
+            solver.prove_defaults(defaults)
+        return defaults
+
+    def minimize(solver, bad, step, level):
+        inputs = list(Variable.inputs.values())
+        Witness.get_defaults(solver, [input_variable for input_variable in inputs
+            if isinstance(input_variable.sid_line, Bitvector)])
+        witness = solver.get_input_values(inputs)
+        if not Witness.replay(bad, step, witness):
+            print_message("witness not replayable: keeping all inputs\n", step, level)
+            return inputs
+        for input_variable in inputs:
+            default = Witness.get_default(input_variable.sid_line)
+            if witness[input_variable] != default:
+                minimized = {**witness, input_variable: default}
+                if Witness.replay(bad, step, minimized):
+                    witness = minimized
+        essential = [input_variable for input_variable in inputs
+            if witness[input_variable] != Witness.get_default(input_variable.sid_line)]
+        Witness.number_of_witness_inputs += len(inputs)
+        Witness.number_of_essential_inputs += len(essential)
+        print_message(f"{len(essential)} of {len(inputs)} inputs essential, all others zero\n", step, level)
+        return essential
+
+    def print_witness(solver, bad, step, level):
+        if Witness.MINIMIZE:
+            solver.print_inputs({input_variable.nid: input_variable
+                for input_variable in Witness.minimize(solver, bad, step, level)}, step, level)
+        else:
+            solver.print_inputs(Variable.inputs, step, level)
+
+# all-solutions enumeration
+
+import json
+
+class Enumeration:
+    # solutions of bad properties are streamed to a file as cubes of input values,
+    # inputs missing in a cube may have any value, solutions are counted over
+    # inputs in the cone of influence of the asserted properties only
+
+    ENUMERATION_FILE = None # JSON lines file of cubes
+
+    number_of_cubes = 0
+    number_of_solutions = 0
+
+    def new_file():
+        if Enumeration.ENUMERATION_FILE is not None:
+            open(Enumeration.ENUMERATION_FILE, 'w').close()
+
+    def get_bvdd_cubes(bvdd, cube):
+        # paths to true in value sets are cubes
+        if bvdd is True:
+            yield cube
+        elif BVDD.is_inputs(bvdd):
+            for input_value, inputs_or_output in bvdd.inputs.items():
+                yield from Enumeration.get_bvdd_cubes(inputs_or_output, {**cube, bvdd.var_line: input_value})
+
+    def get_known(cube):
+        return {input_variable: value[1] for input_variable, value in cube.items()
+            if Ternary_Simulation.is_known(value, input_variable.sid_line.size)}
+
+    def is_disjoint(cube, cubes):
+        # cubes are disjoint if they differ in the value of an input in both
+        return all(any(input_variable in other and other[input_variable] != value
+            for input_variable, value in cube.items()) for other in cubes)
+
+    def get_cube(bad, step, witness, negated_bads, cubes):
+        # inputs that may be unknown in ternary replay of witness are not in cube,
+        # unless cube then overlaps with earlier cubes
+        cube = dict(witness)
+        for input_variable in witness:
+            generalized = {**cube, input_variable: Ternary_Simulation.unknown()}
+            if (Enumeration.is_disjoint(Enumeration.get_known(generalized), cubes)
+                    and Witness.replay(bad, step, generalized, negated_bads)):
+                cube = generalized
+        return Enumeration.get_known(cube)
+
+    def get_cone_of_influence(properties):
+        # expressions and variables read transitively by properties through initial and next state functions
+        cone = set()
+        unexplored = [property_line.property_line for property_line in properties]
+        while unexplored:
+            line = unexplored.pop()
+            if line not in cone:
+                cone.add(line)
+                unexplored.extend(Sweep.get_arguments(line))
+                if isinstance(line, State):
+                    unexplored.extend(transition.exp_line
+                        for transition in [line.init_line, line.next_line] if transition is not None)
+        return cone
+
+    def write_cube(output, bad, step, inputs, cube):
+        Enumeration.number_of_cubes += 1
+        Enumeration.number_of_solutions += 2**sum(input_variable.sid_line.size
+            for input_variable in inputs if input_variable not in cube)
+        output.write(json.dumps({"bad": bad.symbol, "step": step,
+            "inputs": {input_variable.name: value for input_variable, value in cube.items()}}) + "\n")
+
+    def enumerate(solver, bad, step, level, args):
+        inputs = list(Variable.inputs.values())
+        if any(isinstance(input_variable.sid_line, Array) for input_variable in inputs):
+            print_message("enumeration of bitvector inputs only: skipping\n", step, level)
+            return
+
+        # bad properties asserted as negated constraints in earlier steps
+        negated_bads = [] if args.unconstraining_bad else list(Bad.bads.values())
+
+        if level == 0:
+            # inputs outside of the cone of influence do not multiply solutions,
+            # below branches branching conditions may involve any inputs
+            cone = Enumeration.get_cone_of_influence([bad, *Constraint.constraints.values(), *negated_bads])
+            inputs = [input_variable for input_variable in inputs if input_variable in cone]
+
+        number_of_cubes = Enumeration.number_of_cubes
+        number_of_solutions = Enumeration.number_of_solutions
+
+        with open(Enumeration.ENUMERATION_FILE, 'a') as output:
+            instance = bad.instance.get_instance(step)
+            if (level == 0 and isinstance(instance, Values) and not Constraint.constraints
+                    and (step == 0 or args.unconstraining_bad)):
+                # value propagation without solver only at the top level without constraints,
+                # and without negated bad properties of earlier steps, otherwise solver enumerates
+                for cube in Enumeration.get_bvdd_cubes(instance.get_true_constraint(), {}):
+                    Enumeration.write_cube(output, bad, step, inputs, cube)
+            else:
+                # disjoint cubes are counted and written only once
+                cubes = []
+                while True:
+                    witness = solver.get_input_values(inputs)
+                    if level == 0:
+                        cube = Enumeration.get_cube(bad, step, witness, negated_bads, cubes)
+                    else:
+                        # branching conditions are not replayed
+                        cube = Enumeration.get_known(witness)
+                    cubes.append(cube)
+                    Enumeration.write_cube(output, bad, step, inputs, cube)
+                    if not cube:
+                        break
+                    solver.block_inputs(cube)
+                    if not solver.is_SAT(solver.prove()):
+                        break
+
+        print_message(f"{Enumeration.number_of_solutions - number_of_solutions} solutions in "
+            f"{Enumeration.number_of_cubes - number_of_cubes} cubes written to {Enumeration.ENUMERATION_FILE}\n", step, level)
+
 # bitme bounded model checker
 
+# wall-clock times at start of bounded model checking and after each step
+step_times = []
+
 def branching_bmc(solver, kmin, kmax, args, step, level):
     while step <= kmax:
         # check model up to kmax steps
@@ -5716,46 +7574,83 @@ def branching_bmc(solver, kmin, kmax, args, step, level):
 
         if step >= kmin:
             # check bad properties from kmin on
-            for bad in Bad.bads.values():
+            for bad in [bad for bad in Bad.bads.values() if bad not in Bad.retired_bads]:
+                if Obligations.is_discharged(bad, step, level):
+                    print_message(f"{bad.symbol} discharged", step, level)
+                    Obligations.number_of_discharged_obligations += 1
+                    if args.unconstraining_bad:
+                        # unsat bad property as lemma
+                        solver.assert_not_this([bad], step)
+                    continue
                 print_message_with_propagation_profile(bad.symbol, step, level)
                 solver.push()
                 solver.assert_this([bad], step)
                 result = solver.prove()
                 if solver.is_SAT(result):
+                    bad.sat_steps.add(step)
                     print_separator('v', step, level)
                     print_message(f"{bad}\n", step, level)
-                    solver.print_inputs(Variable.inputs, step, level)
+                    Witness.print_witness(solver, bad, step, level)
+                    if Enumeration.ENUMERATION_FILE is not None:
+                        Enumeration.enumerate(solver, bad, step, level, args)
                     if Instance.PROPAGATE is not None:
                         print_message_with_propagation_profile("propagation profile\n", step, level)
                     print_separator('^', step, level)
+                    if args.retire_bads or args.stop_when_retired:
+                        Bad.retired_bads.add(bad)
+                elif solver.is_UNSAT(result):
+                    Obligations.discharge(bad, step, level)
                 solver.pop()
+                if solver.is_SAT(result) and args.stop_at_first_bad:
+                    print_message_with_propagation_profile("first counterexample: terminating\n", step, level)
+                    return True
+
+            if Obligations.proven:
+                Obligations.store()
+
+            if args.stop_when_retired and Bad.bads and len(Bad.retired_bads) == len(Bad.bads):
+                print_message_with_propagation_profile("all bad properties retired: terminating\n", step, level)
+                return True
 
         if not args.unconstraining_bad:
-            # assert all bad properties as negated constraints
-            solver.assert_not_this(Bad.bads.values(), step)
+            # assert all unretired bad properties as negated constraints
+            solver.assert_not_this([bad for bad in Bad.bads.values() if bad not in Bad.retired_bads], step)
 
         if args.check_termination and step >= kmin:
-            state_change = False
-            for next_line in Next.nexts.values():
-                # check if state changes
+            # check if any state changes until all changing states are known
+            unknown_next_lines = list(Next.nexts.values())
+            changing_next_lines = set()
+            while unknown_next_lines:
                 solver.push()
-                solver.assert_is_state_changing(next_line, step)
+                solver.assert_is_any_state_changing(unknown_next_lines, step)
                 result = solver.prove()
-                solver.pop()
                 if solver.is_SAT(result):
-                    state_change = True
+                    # states changing in witness may change
+                    witnessed_next_lines = solver.get_changing_states(unknown_next_lines, step)
+                    assert witnessed_next_lines, "witness without state change"
+                    changing_next_lines.update(witnessed_next_lines)
+                    unknown_next_lines = [next_line for next_line in unknown_next_lines
+                        if next_line not in changing_next_lines]
+                solver.pop()
+                if not solver.is_SAT(result):
+                    break
+            for next_line in Next.nexts.values():
+                if next_line in changing_next_lines:
                     print_message(f"state change: {next_line}\n", step, level)
                     # compute next step
                     solver.assert_this([next_line], step)
                 else:
                     solver.assert_state_is_not_changing(next_line, step)
-                if not state_change and next_line is list(Next.nexts.values())[-1]:
-                    print_message_with_propagation_profile("no states changed: terminating\n", step, level)
-                    return
+            if not changing_next_lines:
+                print_message_with_propagation_profile("no states changed: terminating\n", step, level)
+                return
         else:
             # compute next step
             solver.assert_this(Next.nexts.values(), step)
 
+        if Instance.PROPAGATE is not None and BVDD.DYNAMIC_REORDER:
+            BVDD.reorder_dynamically(step, level)
+
         if args.print_transition:
             print_message_with_propagation_profile("transitioning\n", step, level)
         else:
@@ -5787,19 +7682,25 @@ def branching_bmc(solver, kmin, kmax, args, step, level):
 
                 solver.push()
                 solver.assert_this([Ite.branching_conditions], step)
-                branching_bmc(solver, kmin, kmax, args, step + 1, level + 1)
+                is_stopped = branching_bmc(solver, kmin, kmax, args, step + 1, level + 1)
                 solver.pop()
 
+                if is_stopped:
+                    print_separator('^', step, level)
+                    return True
+
                 print_separator('-', step, level)
                 print_message("not branching:\n", step, level)
 
                 solver.push()
                 solver.assert_not_this([Ite.non_branching_conditions], step)
-                branching_bmc(solver, kmin, kmax, args, step + 1, level + 1)
+                is_stopped = branching_bmc(solver, kmin, kmax, args, step + 1, level + 1)
                 solver.pop()
 
                 print_separator('^', step, level)
-                return
+                return is_stopped
+
+        step_times.append(time.perf_counter())
 
         step += 1
 
@@ -5810,6 +7711,15 @@ def bmc(solver, kmin, kmax, args):
     print_message(f"bounded model checking: -kmin {kmin} -kmax {kmax}\n")
     print_separator('-')
 
+    step_times.clear()
+    step_times.append(time.perf_counter())
+
+    Bad.retired_bads.clear()
+
+    Obligations.load_obligations(args)
+
+    Enumeration.new_file()
+
     # initialize all states
     solver.assert_this(Init.inits.values(), 0)
 
@@ -5818,9 +7728,317 @@ def bmc(solver, kmin, kmax, args):
 
     branching_bmc(solver, kmin, kmax, args, 0, 0)
 
+    if Obligations.key is not None:
+        if Obligations.proven:
+            Obligations.store()
+        print_message(f"{Obligations.number_of_discharged_obligations} obligations discharged, "
+            f"{Obligations.number_of_proven_obligations} obligations stored\n")
+
+# localization abstraction
+
+class Localization:
+    # bad properties are checked on abstractions that start with states in their cone
+    # where transitions of all other states are deactivated turning them into free inputs,
+    # hidden states whose transitions are violated by spurious counterexamples become visible,
+    # array states are never hidden since solvers may not support guarded array equalities
+
+    LOCALIZE = False
+
+    number_of_refinements = 0
+
+    def get_cone(bad):
+        return {state for state in bad.property_line.domain if isinstance(state.sid_line, Bitvector)}
+
+    def get_frontier(visible):
+        # hidden states read by transitions of visible states
+        frontier = set()
+        for state in visible:
+            for line in [state.init_line, state.next_line]:
+                if line is not None:
+                    frontier |= {other for other in line.exp_line.domain
+                        if isinstance(other.sid_line, Bitvector) and other not in visible}
+        return frontier
+
+    def get_size(states):
+        return sum(state.sid_line.size for state in states)
+
+    def get_influence(bad, visible, args):
+        # states read transitively by asserted properties and visible transitions,
+        # hidden states outside may follow their transitions without changing the counterexample
+        properties = [bad, *Constraint.constraints.values()]
+        if not args.unconstraining_bad:
+            properties += [bad for bad in Bad.bads.values() if bad not in Bad.retired_bads]
+        influence = set(visible)
+        for property_line in properties:
+            influence |= set(property_line.property_line.domain)
+        unexplored = list(influence)
+        while unexplored:
+            state = unexplored.pop()
+            for line in [state.init_line, state.next_line]:
+                if line is not None:
+                    for other in line.exp_line.domain:
+                        if other not in influence:
+                            influence.add(other)
+                            unexplored.append(other)
+        return influence
+
+    def get_violated_states(solver, hidden, step):
+        # replay transitions of hidden states on counterexample
+        violated = set()
+        for state in hidden:
+            if state.init_line is not None and not solver.is_satisfied(state.init_line, 0):
+                violated.add(state)
+            elif state.next_line is not None and any(not solver.is_satisfied(state.next_line, k)
+                    for k in range(step)):
+                violated.add(state)
+        return violated
+
+    def is_reachable(solver, bad, step, states, visible, args):
+        # refine visible states until abstract counterexample replays on hidden states, if any
+        while solver.is_SAT(solver.prove_activated([solver.get_activation(state) for state in visible])):
+            hidden = (states - visible) & Localization.get_influence(bad, visible, args)
+            violated = Localization.get_violated_states(solver, hidden, step)
+            if not violated:
+                return True
+            refined = violated & Localization.get_frontier(visible)
+            visible |= refined if refined else violated
+            Localization.number_of_refinements += 1
+            print_message(f"{bad.symbol} refined with {len(visible)} of {len(states)} states\n", step, 0)
+        return False
+
+    def check(solver, kmin, kmax, args, states, visible):
+        arrays = [state for state in State.states.values() if isinstance(state.sid_line, Array)]
+
+        solver.assert_this([state.init_line for state in arrays if state.init_line is not None], 0)
+        for state in states:
+            if state.init_line is not None:
+                solver.assert_activated([state.init_line], 0, solver.get_activation(state))
+
+        step = 0
+        while step <= kmax:
+            solver.assert_this(Constraint.constraints.values(), step)
+
+            if step >= kmin:
+                for bad in [bad for bad in Bad.bads.values() if bad not in Bad.retired_bads]:
+                    print_message(f"{bad.symbol} with {len(visible[bad])} of {len(states)} states", step, 0)
+                    solver.push()
+                    solver.assert_this([bad], step)
+                    is_sat = Localization.is_reachable(solver, bad, step, states, visible[bad], args)
+                    if is_sat:
+                        bad.sat_steps.add(step)
+                        print_separator('v', step, 0)
+                        print_message(f"{bad}\n", step, 0)
+                        solver.print_inputs(Variable.inputs, step, 0)
+                        print_separator('^', step, 0)
+                        if args.retire_bads or args.stop_when_retired:
+                            Bad.retired_bads.add(bad)
+                    solver.pop()
+                    if is_sat and args.stop_at_first_bad:
+                        print_message("first counterexample: terminating\n", step, 0)
+                        return
+
+                if args.stop_when_retired and Bad.bads and len(Bad.retired_bads) == len(Bad.bads):
+                    print_message("all bad properties retired: terminating\n", step, 0)
+                    return
+
+            if not args.unconstraining_bad:
+                solver.assert_not_this([bad for bad in Bad.bads.values() if bad not in Bad.retired_bads], step)
+
+            solver.assert_this([state.next_line for state in arrays if state.next_line is not None], step)
+            for state in states:
+                if state.next_line is not None:
+                    solver.assert_activated([state.next_line], step, solver.get_activation(state))
+
+            print_message("transitioning", step, 0)
+
+            step_times.append(time.perf_counter())
+
+            step += 1
+
+        print_message("reached kmax: terminating\n", step, 0)
+
+def localization_bmc(solver, kmin, kmax, args):
+    unsupported = [flag for flag, is_set in [
+        ("-propagate", Instance.PROPAGATE is not None),
+        ("--branching", args.branching),
+        ("--check-termination", args.check_termination),
+        ("-obligations", Obligations.OBLIGATIONS_FILE is not None),
+        ("-enumerate", Enumeration.ENUMERATION_FILE is not None),
+        ("--minimize-witness", Witness.MINIMIZE)] if is_set]
+    if unsupported:
+        print_message(f"localization abstraction without {', '.join(unsupported)} only: checking all states\n")
+        return bmc(solver, kmin, kmax, args)
+
+    print_separator('-')
+    print_message(f"localization abstraction: -kmin {kmin} -kmax {kmax}\n")
+    print_separator('-')
+
+    step_times.clear()
+    step_times.append(time.perf_counter())
+
+    Bad.retired_bads.clear()
+
+    Localization.number_of_refinements = 0
+
+    states = {state for state in State.states.values() if isinstance(state.sid_line, Bitvector)}
+    visible = {bad: Localization.get_cone(bad) for bad in Bad.bads.values()}
+
+    Localization.check(solver, kmin, kmax, args, states, visible)
+
+    for bad in Bad.bads.values():
+        print_message(f"abstraction of {bad.symbol}: {len(visible[bad])} of {len(states)} states, "
+            f"{Localization.get_size(visible[bad])} of {Localization.get_size(states)} state bits\n")
+    print_message(f"{Localization.number_of_refinements} refinements\n")
+
+# persistent proof obligations
+
+import os
+import hashlib
+import fcntl
+
+class Obligations:
+    # unsat bad properties per step are stored by model hash and flags that change what is asserted,
+    # discharged obligations are asserted as lemmas instead of being proven again in later runs
+
+    OBLIGATIONS_FILE = None # JSON file of discharged obligations
+
+    CONTEXT_FLAGS = ['kmin', 'unconstraining_bad', 'retire_bads', 'stop_when_retired', 'branching']
+
+    digest = None
+    key = None
+
+    discharged = {}
+    proven = {}
+
+    number_of_discharged_obligations = 0
+    number_of_proven_obligations = 0
+
+    def new_digest():
+        Obligations.digest = hashlib.sha256() if Obligations.OBLIGATIONS_FILE is not None else None
+
+    def get_key(args):
+        flags = hashlib.sha256(repr([vars(args)[flag] for flag in Obligations.CONTEXT_FLAGS]).encode()).hexdigest()[:16]
+        return f"{Obligations.digest.hexdigest()}-{flags}"
+
+    def load():
+        if os.path.exists(Obligations.OBLIGATIONS_FILE):
+            with open(Obligations.OBLIGATIONS_FILE, 'r') as obligations_file:
+                return json.load(obligations_file)
+        return {}
+
+    def store():
+        # merge with obligations stored concurrently under a lock on a separate file
+        # since the obligations file itself is replaced
+        with open(f"{Obligations.OBLIGATIONS_FILE}.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            obligations = Obligations.load()
+            stored = obligations.setdefault(Obligations.key, {})
+            for nid, steps in Obligations.proven.items():
+                stored[nid] = sorted(set(stored.get(nid, [])) | steps)
+            temporary_file = f"{Obligations.OBLIGATIONS_FILE}.{os.getpid()}"
+            with open(temporary_file, 'w') as obligations_file:
+                json.dump(obligations, obligations_file, indent=2)
+            os.replace(temporary_file, Obligations.OBLIGATIONS_FILE)
+        Obligations.proven = {}
+
+    def load_obligations(args):
+        Obligations.key = None
+        Obligations.number_of_discharged_obligations = 0
+        Obligations.number_of_proven_obligations = 0
+        if Obligations.OBLIGATIONS_FILE is not None and Obligations.digest is not None:
+            Obligations.key = Obligations.get_key(args)
+            Obligations.discharged = {nid: set(steps)
+                for nid, steps in Obligations.load().get(Obligations.key, {}).items()}
+            Obligations.proven = {}
+            print_message(f"{sum(len(steps) for steps in Obligations.discharged.values())} "
+                f"discharged obligations in {Obligations.OBLIGATIONS_FILE}\n")
+
+    def is_discharged(bad, step, level):
+        # obligations below branches are proven under branching conditions
+        return Obligations.key is not None and level == 0 and step in Obligations.discharged.get(str(bad.nid), ())
+
+    def discharge(bad, step, level):
+        if Obligations.key is not None and level == 0:
+            Obligations.proven.setdefault(str(bad.nid), set()).add(step)
+            Obligations.number_of_proven_obligations += 1
+
 # rotor model generator
 
-def load_binary():
+import mmap
+import struct
+
+# ELF loading
+
+ELF_MAGIC = b'\x7fELF'
+
+ELFCLASS32 = 1
+ELFCLASS64 = 2
+
+ELFDATA2LSB = 1
+
+EM_RISCV = 243
+
+PT_LOAD = 1
+
+PF_X = 1
+
+PAGESIZE = 4096
+
+entry_point = 0
+
+code_binary = b''
+data_binary = b''
+
+def read_elf_segments(binary):
+    # returns word size, entry point, and (vaddr, memsz, contents) of code and data segments
+    if binary[:4] != ELF_MAGIC:
+        raise system_error("ELF magic number expected")
+    elf_class = binary[4]
+    if elf_class == ELFCLASS64:
+        header_format, program_header_format = '<HHIQQQIHHHHHH', '<IIQQQQQQ'
+    elif elf_class == ELFCLASS32:
+        header_format, program_header_format = '<HHIIIIIHHHHHH', '<IIIIIIII'
+    else:
+        raise system_error(f"unknown ELF class {elf_class}")
+    if binary[5] != ELFDATA2LSB:
+        raise system_error("little-endian ELF binary expected")
+    (_, e_machine, _, e_entry, e_phoff, _, _, _,
+        e_phentsize, e_phnum, _, _, _) = struct.unpack_from(header_format, binary, 16)
+    if e_machine != EM_RISCV:
+        raise system_error(f"RISC-V ELF binary expected but got machine {e_machine}")
+    code_segment = data_segment = None
+    for ph in range(e_phnum):
+        if elf_class == ELFCLASS64:
+            p_type, p_flags, p_offset, p_vaddr, _, p_filesz, p_memsz, _ = struct.unpack_from(
+                program_header_format, binary, e_phoff + ph * e_phentsize)
+        else:
+            p_type, p_offset, p_vaddr, _, p_filesz, p_memsz, p_flags, _ = struct.unpack_from(
+                program_header_format, binary, e_phoff + ph * e_phentsize)
+        if p_type == PT_LOAD:
+            segment = (p_vaddr, p_memsz, binary[p_offset:p_offset + p_filesz])
+            if p_flags & PF_X:
+                if code_segment is not None:
+                    raise system_error("single executable ELF segment expected")
+                code_segment = segment
+            else:
+                if data_segment is not None:
+                    raise system_error("single non-executable ELF segment expected")
+                data_segment = segment
+    if code_segment is None:
+        raise system_error("executable ELF segment expected")
+    return 8 if elf_class == ELFCLASS64 else 4, e_entry, code_segment, data_segment
+
+def load_binary(binary_file = None):
+    global IS64BITTARGET
+
+    global WORDSIZE
+    global WORDSIZEINBITS
+
+    global entry_point
+
+    global code_binary
+    global data_binary
+
     global max_code_size
 
     global code_start
@@ -5841,20 +8059,52 @@ def load_binary():
     global stack_start
     global stack_size
 
-    max_code_size = 7 * INSTRUCTIONSIZE
+    if binary_file is None:
+        max_code_size = 7 * INSTRUCTIONSIZE
 
-    code_start = 4096;
-    code_size  = max_code_size;
+        code_start = 4096;
+        code_size  = max_code_size;
 
-    max_data_size = WORDSIZE
+        max_data_size = WORDSIZE
 
-    data_start = 8192;
-    data_size  = max_data_size;
+        data_start = 8192;
+        data_size  = max_data_size;
 
-    heap_initial_size = 0;
+        entry_point = code_start
 
-    heap_start = 12288;
-    heap_size  = heap_allowance;
+        heap_initial_size = 0;
+
+        heap_start = 12288;
+        heap_size  = heap_allowance;
+    else:
+        with open(binary_file, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as binary:
+                WORDSIZE, entry_point, code_segment, data_segment = read_elf_segments(binary)
+
+        IS64BITTARGET  = WORDSIZE == 8
+        WORDSIZEINBITS = WORDSIZE * 8
+
+        code_start, code_size, code_binary = code_segment
+
+        code_size = code_size + -code_size % INSTRUCTIONSIZE
+
+        max_code_size = max(code_size, WORDSIZE)
+
+        if data_segment is not None:
+            data_start, data_size, data_binary = data_segment
+        else:
+            data_start, data_size, data_binary = code_start + code_size + -(code_start + code_size) % PAGESIZE, 0, b''
+
+        data_size = max(data_size + -data_size % WORDSIZE, WORDSIZE)
+
+        max_data_size = data_size
+
+        heap_initial_size = 0;
+
+        heap_start = data_start + data_size + -(data_start + data_size) % PAGESIZE
+        heap_size  = heap_allowance;
+
+        print(f"loaded {len(code_binary)} bytes of code @ 0x{code_start:X} and {len(data_binary)} bytes of data @ 0x{data_start:X} from {binary_file}")
 
     stack_initial_size = 0;
 
@@ -5863,55 +8113,838 @@ def load_binary():
 
     assert stack_start >= heap_start + heap_size > 0
 
-def rotor_model():
+# BTOR2 emitter
+
+import gzip
+
+class Emitter:
+    # streams lines in creation order with dense nids to buffered, optionally gzip-compressed file
+    BUFFER_SIZE = 2**16
+
+    emitter = None
+
+    def __init__(self, model_file):
+        if model_file.endswith('.gz'):
+            self.file = gzip.open(model_file, 'wt', encoding='UTF-8')
+        else:
+            self.file = open(model_file, 'w', encoding='UTF-8', buffering=Emitter.BUFFER_SIZE)
+        self.model_file = model_file
+        self.pending_line = None
+        self.number_of_lines = 0
+        assert Emitter.emitter is None
+        Emitter.emitter = self
+
+    def new_line(self, line):
+        # pending line is complete once next line is created
+        self.flush()
+        self.pending_line = line
+
+    def flush(self):
+        if self.pending_line is not None:
+            # operands are already emitted and renumbered
+            self.number_of_lines += 1
+            self.pending_line.nid = self.number_of_lines
+            print(self.pending_line, file=self.file)
+            self.pending_line = None
+
+    def close(self):
+        self.flush()
+        self.file.close()
+        Emitter.emitter = None
+        for registry in [Line.lines, Variable.inputs, State.states, Init.inits, Next.nexts, Constraint.constraints, Bad.bads]:
+            lines = list(registry.values())
+            registry.clear()
+            for line in lines:
+                assert line.nid not in registry
+                registry[line.nid] = line
+        print(f"emitted {self.number_of_lines} lines to {self.model_file}")
+
+# cached machine-interface preludes
+
+import pickle
+
+PRELUDE_CACHE = None # directory of cached preludes, if any
+
+def get_prelude_configuration():
+    # everything the prelude depends on besides the loaded program
+    return (IS64BITTARGET, WORDSIZE, RISCUONLY, RV32M, RV64M, RVC, VIRTUAL_ADDRESS_SPACE,
+        calculate_address_space(max_code_size, min(CODEWORDSIZEINBITS, WORDSIZEINBITS)),
+        calculate_address_space(max_data_size, min(MEMORYWORDSIZEINBITS, WORDSIZEINBITS)),
+        heap_allowance, stack_allowance, BYTES_TO_READ,
+        None if instruction_IDs is None else sorted(instruction_IDs))
+
+def init_prelude():
+    init_machine_interface()
+    init_kernel_interface()
+    init_register_file_sorts()
+    init_memory_sorts()
+
+    init_instruction_sorts()
+    init_compressed_instruction_sorts()
+
+def load_prelude():
+    if PRELUDE_CACHE is None:
+        init_prelude()
+        return
+
+    key = hashlib.sha256(repr(get_prelude_configuration()).encode()).hexdigest()[:16]
+    prelude_file = os.path.join(PRELUDE_CACHE, f"prelude-{key}.pickle")
+
+    if os.path.exists(prelude_file):
+        with open(prelude_file, 'rb') as file:
+            lines, variables, boolean, false, true = pickle.load(file)
+        for line in lines:
+            # nids are assigned anew in order
+            line.nid = next_nid()
+            line.new_line()
+        globals().update(variables)
+        if Bool.boolean is None:
+            Bool.boolean = boolean
+        if Constant.false is None:
+            Constant.false = false
+        if Constant.true is None:
+            Constant.true = true
+        print(f"loaded {len(lines)} prelude lines from {prelude_file}")
+    else:
+        module = globals()
+        before = dict(module)
+        first_nid = current_nid
+        init_prelude()
+        lines = [line for nid, line in Line.lines.items() if nid > first_nid]
+        variables = {name: value for name, value in module.items()
+            if name != 'current_nid' and (name not in before or before[name] is not value)}
+        os.makedirs(PRELUDE_CACHE, exist_ok=True)
+        with open(prelude_file, 'wb') as file:
+            pickle.dump((lines, variables, Bool.boolean, Constant.false, Constant.true), file)
+        print(f"saved {len(lines)} prelude lines to {prelude_file}")
+
+def rotor_model(binary_file = None, number_of_cores = None, model_file = None):
+    global instruction_IDs
+
     try:
-        load_binary()
+        if model_file is not None:
+            Emitter(model_file)
+
+        load_binary(binary_file)
 
-        init_machine_interface()
-        init_kernel_interface()
-        init_register_file_sorts()
-        init_memory_sorts()
+        if LOADEDIDSONLY:
+            instruction_IDs = scan_instruction_IDs(code_binary)
+            print(f"{len(instruction_IDs - {ID_UNKNOWN})} distinct instructions in loaded code")
+
+        load_prelude()
 
         new_segmentation()
 
-        init_instruction_sorts()
-        init_compressed_instruction_sorts()
+        system = System(number_of_cores)
+
+        if Emitter.emitter is not None:
+            Emitter.emitter.close()
 
-        print(System())
+        print(system)
     except Exception as message:
         print(f"modeling exception: {message}")
         exit(1)
 
 import sys
 
+def run_rotor(argv):
+    # rotor detects the host OS from the ELF magic number of argv[0]
+    argv = [sys.executable] + argv
+    rotor.main.argtypes = ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)
+    return rotor.main(len(argv), (ctypes.c_char_p * len(argv))(*[arg.encode('utf-8') for arg in argv]))
+
+def rotor_model_file(argv):
+    # rotor writes model into anonymous in-memory file handed to the parser
+    model_fd = os.memfd_create("rotor-model")
+    exit_code = run_rotor(argv + ['-o', f"/dev/fd/{model_fd}"])
+    model_stat = os.fstat(model_fd)
+    for fd in os.listdir("/proc/self/fd"):
+        # close model file descriptor left open by rotor
+        try:
+            fd_stat = os.fstat(int(fd))
+        except OSError:
+            continue
+        if int(fd) != model_fd and (fd_stat.st_dev, fd_stat.st_ino) == (model_stat.st_dev, model_stat.st_ino):
+            os.close(int(fd))
+    if exit_code != 0:
+        os.close(model_fd)
+        print(f"rotor exited with {exit_code}")
+        exit(exit_code)
+    modelfile = open(f"/dev/fd/{model_fd}", 'r')
+    os.close(model_fd)
+    return modelfile
+
 def try_rotor():
     if is_rotor_present and len(sys.argv) > 1 and sys.argv[1] == '--rotor':
         # just run rotor
-        argv = [sys.argv[0]] + sys.argv[2:] # remove --rotor but keep all other arguments
-        rotor.main.argtypes = ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)
-        rotor.main(len(argv), (ctypes.c_char_p * len(argv))(*[arg.encode('utf-8') for arg in argv]))
+        run_rotor(sys.argv[2:]) # remove --rotor but keep all other arguments
         exit(0)
+    elif is_rotor_present and len(sys.argv) > 1 and sys.argv[1] == '--rotor-bitme':
+        # run rotor with arguments up to -- and check its model in-process with remaining arguments
+        argv = sys.argv[2:]
+        separator = argv.index('--') if '--' in argv else len(argv)
+        return rotor_model_file(argv[:separator]), argv[separator + 1:]
+    return None, sys.argv[1:]
 
-import argparse
+# re-entrant model context
 
-def main():
-    try_rotor()
+import copy
+
+class Model:
+    # model state of lowercase class attributes, nids, module state, and generator sorts and nodes
+    # swapped in and out, one model at a time: models are checked concurrently only in separate processes
+
+    MODULE_STATE = ('parse_times', 'step_times', 'instruction_IDs',
+        'entry_point', 'code_binary', 'data_binary',
+        'max_code_size', 'code_start', 'code_size',
+        'max_data_size', 'data_start', 'data_size',
+        'heap_initial_size', 'heap_start', 'heap_size',
+        'stack_initial_size', 'stack_start', 'stack_size')
+
+    pristine = {}
+
+    def __init__(self):
+        self.state = {key: copy.copy(value) for key, value in Model.pristine.items()}
+        self.outer_states = []
+
+    def __enter__(self):
+        self.outer_states.append(Model.get_state())
+        Model.set_state(self.state)
+        return self
+
+    def __exit__(self, *exception):
+        self.state = Model.get_state()
+        Model.set_state(self.outer_states.pop())
+
+    def get_state_keys():
+        for clss in [value for value in globals().values() if isinstance(value, type) and value.__module__ == __name__]:
+            if clss is not Model:
+                for name, value in list(vars(clss).items()):
+                    if name.islower() and not name.startswith('__') and not callable(value):
+                        yield (clss, name)
+        for name in list(globals()):
+            if (name == 'current_nid' or name in Model.MODULE_STATE
+                    or name.startswith('SID_') or name.startswith('NID_')):
+                yield (None, name)
+
+    def get_state():
+        return {(clss, name): globals()[name] if clss is None else vars(clss)[name]
+            for clss, name in Model.get_state_keys()}
+
+    def set_state(state):
+        for clss, name in list(Model.get_state_keys()):
+            # e.g. counters inherited before first use
+            if (clss, name) not in state:
+                if clss is None:
+                    del globals()[name]
+                else:
+                    delattr(clss, name)
+        for (clss, name), value in state.items():
+            if clss is None:
+                globals()[name] = value
+            else:
+                setattr(clss, name, value)
+
+Model.pristine = {key: copy.copy(value) for key, value in Model.get_state().items()}
+
+def parse_model(modelfile, outputfile, args):
+    are_there_state_transitions = parse_btor2(modelfile, outputfile)
+
+    if Instance.PROPAGATE is not None and args.dependency_order:
+        BVDD.set_dependency_order([*Bad.bads.values(), *Constraint.constraints.values(), *Next.nexts.values()])
 
+    return are_there_state_transitions
+
+def check_parsed_model(are_there_state_transitions, args):
+    if args.kmin or args.kmax:
+        kmin = args.kmin[0] if args.kmin else 0
+        kmax = args.kmax[0] if args.kmax else 0
+
+        if are_there_state_transitions:
+            kmax = max(kmin, kmax)
+        else:
+            kmin = kmax = 0
+
+        if is_Z3_present and args.use_Z3:
+            solver = Z3_Solver()
+            if Localization.LOCALIZE:
+                localization_bmc(solver, kmin, kmax, args)
+            else:
+                bmc(solver, kmin, kmax, args)
+
+        if is_bitwuzla_present and args.use_bitwuzla:
+            solver = Bitwuzla_Solver()
+            if Localization.LOCALIZE:
+                localization_bmc(solver, kmin, kmax, args)
+            else:
+                bmc(solver, kmin, kmax, args)
+
+    print_separator('#')
+
+def check_model(modelfile, outputfile, args):
+    check_parsed_model(parse_model(modelfile, outputfile, args), args)
+
+# batch runner
+
+import glob
+import tempfile
+import signal
+import resource
+import csv
+
+class Batch:
+    # checks models in forked worker processes with per-model time and memory limits
+    JOBS = 1
+    TIMEOUT = None # seconds
+    MEMORY = None # megabytes
+
+    EXIT_MEMORY_OUT = 3
+
+    def __init__(self, model_names, args, timeout = None, is_printing_output = True, model_args = None):
+        self.model_names = list(model_names)
+        self.pending = list(model_names)
+        self.args = args
+        # autotuned arguments per model, if any
+        self.model_args = {} if model_args is None else model_args
+        self.timeout = timeout if timeout is not None else Batch.TIMEOUT
+        self.is_printing_output = is_printing_output
+        # worker pid: model name, start time, deadline, output file, result file
+        self.workers = {}
+        self.results = []
+
+    def get_model_names(patterns):
+        for pattern in patterns:
+            if os.path.isdir(pattern):
+                yield from sorted(glob.glob(os.path.join(pattern, '*.btor2')))
+            elif glob.has_magic(pattern):
+                yield from sorted(glob.glob(pattern))
+            else:
+                yield pattern
+
+    def check(model_name, args, output_fd, result_fd):
+        # runs in worker process
+        os.dup2(output_fd, 1)
+        if Batch.MEMORY is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (Batch.MEMORY * 2**20, Batch.MEMORY * 2**20))
+        exit_code = 0
+        try:
+            configure(args)
+            # fresh model context rather than the state of the forking process
+            with Model(), open(model_name, 'r') as modelfile:
+                check_model(modelfile, None, args)
+                bads = {bad.symbol if bad.symbol else str(bad.nid): sorted(bad.sat_steps) for bad in Bad.bads.values()}
+            step_seconds = [round(end - start, 6) for start, end in zip(step_times, step_times[1:])]
+            os.write(result_fd, json.dumps({"bads": bads, "step_seconds": step_seconds}).encode('utf-8'))
+        except MemoryError:
+            exit_code = Batch.EXIT_MEMORY_OUT
+        except SystemExit as exit_status:
+            exit_code = exit_status.code if isinstance(exit_status.code, int) else 1
+        except Exception as message:
+            print(f"checking exception: {message}")
+            # solvers report exhausted address space as exception
+            exit_code = Batch.EXIT_MEMORY_OUT if "out of memory" in str(message) else 1
+        sys.stdout.flush()
+        os._exit(exit_code)
+
+    def start(self, model_name):
+        output_file = tempfile.TemporaryFile()
+        result_file = tempfile.TemporaryFile()
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            Batch.check(model_name, self.model_args.get(model_name, self.args), output_file.fileno(), result_file.fileno())
+        start_time = time.perf_counter()
+        deadline = start_time + self.timeout if self.timeout is not None else None
+        self.workers[pid] = model_name, start_time, deadline, output_file, result_file
+
+    def finish(self, pid, status, rusage, is_timeout):
+        model_name, start_time, _, output_file, result_file = self.workers.pop(pid)
+
+        if self.is_printing_output:
+            output_file.seek(0)
+            sys.stdout.write(output_file.read().decode('utf-8', errors='replace'))
+            sys.stdout.flush()
+        output_file.close()
+
+        result_file.seek(0)
+        result = json.loads(result_file.read() or '{}')
+        result_file.close()
+
+        if is_timeout:
+            outcome = "timeout"
+        elif os.WIFSIGNALED(status):
+            outcome = f"signal {os.WTERMSIG(status)}"
+        elif os.WEXITSTATUS(status) == Batch.EXIT_MEMORY_OUT:
+            outcome = "memout"
+        elif os.WEXITSTATUS(status) != 0:
+            outcome = f"exit {os.WEXITSTATUS(status)}"
+        else:
+            outcome = "checked"
+
+        self.results.append({"model": model_name, "outcome": outcome,
+            "seconds": round(time.perf_counter() - start_time, 3),
+            # ru_maxrss is in kilobytes on Linux
+            "peak_rss_kb": rusage.ru_maxrss,
+            "bads": result.get("bads", {}),
+            "step_seconds": result.get("step_seconds", [])})
+
+    def run(self):
+        timed_out = set()
+        while self.pending or self.workers:
+            while self.pending and len(self.workers) < Batch.JOBS:
+                self.start(self.pending.pop(0))
+            pid, status, rusage = os.wait4(-1, os.WNOHANG)
+            if pid != 0:
+                self.finish(pid, status, rusage, pid in timed_out)
+                timed_out.discard(pid)
+            else:
+                now = time.perf_counter()
+                for pid, (_, _, deadline, _, _) in self.workers.items():
+                    if deadline is not None and now > deadline and pid not in timed_out:
+                        os.kill(pid, signal.SIGKILL)
+                        timed_out.add(pid)
+                time.sleep(0.01)
+        # summarize in given order rather than order of completion
+        return sorted(self.results, key=lambda result: self.model_names.index(result['model']))
+
+    def print_summary(results):
+        print_separator('#')
+        print("batch summary:")
+        for result in results:
+            print(f"{result['model']}: {result['outcome']} in {result['seconds']}s, {result['peak_rss_kb']}KB peak RSS")
+            for bad, steps in result['bads'].items():
+                print(f"  {bad}: " + (f"reachable at {steps}" if steps else "unreachable"))
+
+    def write_summary(results, summary_name):
+        with open(summary_name, 'w', newline='') as summary_file:
+            if summary_name.endswith('.csv'):
+                writer = csv.writer(summary_file)
+                writer.writerow(["model", "outcome", "seconds", "peak_rss_kb", "bad", "sat_steps"])
+                for result in results:
+                    row = [result['model'], result['outcome'], result['seconds'], result['peak_rss_kb']]
+                    if result['bads']:
+                        for bad, steps in result['bads'].items():
+                            writer.writerow(row + [bad, ' '.join(map(str, steps))])
+                    else:
+                        writer.writerow(row + ["", ""])
+            else:
+                json.dump(results, summary_file, indent=2)
+
+# configuration autotuner
+
+class Autotune:
+    # probes candidate configurations on the first steps of a model and continues with the fastest
+    PROBE_STEPS = 3
+    PROBE_TIMEOUT = 10 # seconds per candidate
+    TUNING_FILE = None # JSON file of decisions per model hash
+
+    CANDIDATES = [
+        ['--use-Z3'],
+        ['--use-Z3', '--substitute'],
+        ['--use-Z3', '-propagate', '8'],
+        ['--use-bitwuzla'],
+        ['--use-bitwuzla', '--substitute'],
+        ['--use-bitwuzla', '-propagate', '8'],
+        ['--use-bitwuzla', '-array', '8'],
+        ['--use-bitwuzla', '-array', '8', '--recursive-array']]
+
+    # flags set by candidates, all others are taken from the command line
+    TUNED_FLAGS = ['use_Z3', 'use_bitwuzla', 'propagate', 'substitute', 'array', 'recursive_array']
+
+    def is_available(candidate):
+        return ((is_Z3_present or ('--use-Z3' not in candidate and '--sweep' not in candidate))
+            and (is_bitwuzla_present or '--use-bitwuzla' not in candidate))
+
+    def get_tuned_args(parser, args, candidate, kmax = None):
+        candidate_args = vars(parser.parse_args(candidate))
+        tuned_args = argparse.Namespace(**vars(args))
+        for flag in Autotune.TUNED_FLAGS:
+            setattr(tuned_args, flag, candidate_args[flag])
+        if kmax is not None:
+            tuned_args.kmax = [kmax]
+        return tuned_args
+
+    def estimate(result, kmax):
+        # extrapolate per-step cost fitted linearly in step up to kmax
+        step_seconds = result['step_seconds']
+        n = len(step_seconds)
+        mean_step = (n - 1) / 2
+        mean_seconds = sum(step_seconds) / n
+        if n > 1:
+            slope = sum((step - mean_step) * (seconds - mean_seconds) for step, seconds in enumerate(step_seconds))
+            slope = max(slope / sum((step - mean_step) ** 2 for step in range(n)), 0)
+        else:
+            slope = 0
+        parse_seconds = result['seconds'] - sum(step_seconds)
+        return parse_seconds + sum(max(mean_seconds + slope * (step - mean_step), 0) for step in range(kmax + 1))
+
+    def load_decisions():
+        if Autotune.TUNING_FILE is not None and os.path.exists(Autotune.TUNING_FILE):
+            with open(Autotune.TUNING_FILE, 'r') as tuning_file:
+                return json.load(tuning_file)
+        return {}
+
+    def store_decisions(decisions):
+        if Autotune.TUNING_FILE is not None:
+            with open(Autotune.TUNING_FILE, 'w') as tuning_file:
+                json.dump(decisions, tuning_file, indent=2)
+
+    def probe(parser, model_name, args, kmax):
+        estimates = []
+        for candidate in filter(Autotune.is_available, Autotune.CANDIDATES):
+            probe_args = Autotune.get_tuned_args(parser, args, candidate, min(kmax, Autotune.PROBE_STEPS))
+            # probes slower than the full estimated run of the best candidate cannot win
+            timeout = min([Autotune.PROBE_TIMEOUT, *[estimate for estimate, _ in estimates]])
+            result = Batch([model_name], probe_args, timeout, False).run()[0]
+            if result['outcome'] == "checked" and result['step_seconds']:
+                estimates.append((Autotune.estimate(result, kmax), candidate))
+                print(f"{' '.join(candidate)}: {estimates[-1][0]:.3f}s estimated for -kmax {kmax}")
+            else:
+                print(f"{' '.join(candidate)}: {result['outcome']}")
+        return min(estimates, key=lambda estimate: estimate[0])[1] if estimates else None
+
+    def tune(parser, model_name, args):
+        kmax = max(args.kmin[0] if args.kmin else 0, args.kmax[0] if args.kmax else 0)
+
+        with open(model_name, 'rb') as modelfile:
+            digest = hashlib.sha256(modelfile.read()).hexdigest()
+
+        print_separator('#')
+        print(f"autotuning: {model_name}")
+
+        decisions = Autotune.load_decisions()
+        if digest in decisions:
+            candidate = decisions[digest]
+            print(f"stored decision: {' '.join(candidate)}")
+        else:
+            candidate = Autotune.probe(parser, model_name, args, kmax)
+            if candidate is None:
+                print("no candidate completed probing: keeping command line configuration")
+                return args
+            print(f"decision: {' '.join(candidate)}")
+            decisions = Autotune.load_decisions()
+            decisions[digest] = candidate
+            Autotune.store_decisions(decisions)
+
+        return Autotune.get_tuned_args(parser, args, candidate)
+
+# benchmark suite
+
+import statistics
+import contextlib
+
+class Timed_Solver:
+    # times term construction and solving of the wrapped solver
+    TERM_FUNCTIONS = {'assert_this', 'assert_not_this', 'assert_activated',
+        'assert_is_state_changing', 'assert_is_any_state_changing', 'assert_state_is_not_changing'}
+    SOLVE_FUNCTIONS = {'prove', 'prove_activated', 'simplify'}
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.term_seconds = 0
+        # end time and seconds of each solver call
+        self.solve_calls = []
+
+    def __getattr__(self, name):
+        function = getattr(self.solver, name)
+        if name not in Timed_Solver.TERM_FUNCTIONS and name not in Timed_Solver.SOLVE_FUNCTIONS:
+            return function
+        def timed_function(*args):
+            start_time = time.perf_counter()
+            result = function(*args)
+            end_time = time.perf_counter()
+            if name in Timed_Solver.TERM_FUNCTIONS:
+                self.term_seconds += end_time - start_time
+            else:
+                self.solve_calls.append((end_time, end_time - start_time))
+            return result
+        return timed_function
+
+    def get_solve_seconds_per_step(self):
+        # solver calls count for the step during which they end
+        solve_seconds = [0.0] * (len(step_times) - 1)
+        for end_time, seconds in self.solve_calls:
+            step = bisect.bisect_left(step_times, end_time) - 1
+            if 0 <= step < len(solve_seconds):
+                solve_seconds[step] += seconds
+        return solve_seconds
+
+class Benchmark:
+    # times phases of fixed models and configurations, results in periscope JSON format
+    WARMUPS = 1
+    REPETITIONS = 5
+    KMAX = 3
+
+    CONFIGURATIONS = {
+        'z3': ['--use-Z3'],
+        'z3-substitute': ['--use-Z3', '--substitute'],
+        'bitwuzla': ['--use-bitwuzla'],
+        'bitwuzla-propagate': ['--use-bitwuzla', '-propagate', '8'],
+        'bitwuzla-array': ['--use-bitwuzla', '-array', '8'],
+        'bitwuzla-sweep': ['--use-bitwuzla', '--sweep']}
+
+    # numbers of cores of models generated by rotor_model()
+    GENERATED_CORES = [1, 2, 4]
+
+    def generate(model_name, number_of_cores):
+        with Model(), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start_time = time.perf_counter()
+            rotor_model(None, number_of_cores, model_name)
+            return {'generate': time.perf_counter() - start_time}, [], (0.0, 0.0)
+
+    def measure(parser, model_name, flags):
+        args = parser.parse_args([*flags, '-kmax', str(Benchmark.KMAX)])
+        configure(args)
+        start_usage = resource.getrusage(resource.RUSAGE_SELF)
+        start_time = time.perf_counter()
+        with Model(), open(model_name, 'r') as modelfile, open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            are_there_state_transitions = parse_model(modelfile, None, args)
+            solver = Timed_Solver(Z3_Solver() if args.use_Z3 else Bitwuzla_Solver())
+            bmc(solver, 0, Benchmark.KMAX if are_there_state_transitions else 0, args)
+            phases = {
+                'parse': parse_times[1] - parse_times[0],
+                'mapping': parse_times[2] - parse_times[1],
+                'sweeping': Sweep.sweeping_seconds,
+                'propagation': Instance.propagation_seconds,
+                'terms': solver.term_seconds - Instance.propagation_seconds,
+                **{f"solve-{step}": seconds for step, seconds in enumerate(solver.get_solve_seconds_per_step())}}
+            props = [{"kind": "bad", "name": bad.symbol, "node": bad.nid, "idx": index}
+                for index, bad in enumerate(Bad.bads.values())]
+        phases['total'] = time.perf_counter() - start_time
+        end_usage = resource.getrusage(resource.RUSAGE_SELF)
+        return phases, props, (end_usage.ru_utime - start_usage.ru_utime, end_usage.ru_stime - start_usage.ru_stime)
+
+    def get_periscope_result(model_name, command, props, times, usages):
+        with open(model_name, 'r') as modelfile:
+            number_of_words = len(modelfile.read().split())
+        return {"Success": {
+            "props": props,
+            "steps": Benchmark.KMAX,
+            "hyperfine": {"results": [{
+                "command": command,
+                "mean": statistics.mean(times),
+                "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+                "median": statistics.median(times),
+                # user and system times are only measured for whole runs
+                "user": statistics.mean([user for user, _ in usages]),
+                "system": statistics.mean([system for _, system in usages]),
+                "min": min(times),
+                "max": max(times),
+                "times": times,
+                "exit_codes": [0] * len(times)}]},
+            "wc_raw": number_of_words,
+            # no btormc dump, reporting words of model file instead
+            "wc_btormc_dump": number_of_words}}
+
+    def repeat(function, *args):
+        return [function(*args) for _ in range(Benchmark.WARMUPS + Benchmark.REPETITIONS)][Benchmark.WARMUPS:]
+
+    def add_results(results, name, model_name, command, repetitions):
+        props = repetitions[-1][1]
+        for phase in repetitions[0][0]:
+            times = [phases.get(phase, 0.0) for phases, _, _ in repetitions]
+            usages = [usage if phase == 'total' else (0.0, 0.0) for _, _, usage in repetitions]
+            results[f"{name}-{phase}"] = Benchmark.get_periscope_result(model_name, f"{command} ({phase})", props, times, usages)
+            print(f"{name}-{phase}: {statistics.median(times):.6f}s median of {len(times)}")
+
+    def run(parser, model_names, results_name):
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            models = []
+            for number_of_cores in Benchmark.GENERATED_CORES:
+                name = f"rotor-{number_of_cores}-core"
+                model_name = os.path.join(directory, f"{name}.btor2")
+                Benchmark.add_results(results, name, model_name, f"rotor_model(cores={number_of_cores})",
+                    Benchmark.repeat(Benchmark.generate, model_name, number_of_cores))
+                models.append((name, model_name))
+            models += [(os.path.basename(model_name).removesuffix('.btor2'), model_name) for model_name in model_names]
+            for name, model_name in models:
+                for configuration, flags in Benchmark.CONFIGURATIONS.items():
+                    if Autotune.is_available(flags):
+                        command = ' '.join(['bitme', os.path.basename(model_name), *flags, '-kmax', str(Benchmark.KMAX)])
+                        Benchmark.add_results(results, f"{name}-{configuration}", model_name, command,
+                            Benchmark.repeat(Benchmark.measure, parser, model_name, flags))
+        with open(results_name, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+
+# warm analysis server
+
+import socket
+import collections
+
+class Server_Output:
+    # streams printed output of a check request as notifications
+    def __init__(self, server, request_id):
+        self.server = server
+        self.request_id = request_id
+        self.text = []
+
+    def write(self, text):
+        if not text:
+            return 0
+        self.text.append(text)
+        self.server.respond({"method": "output", "params": {"id": self.request_id, "text": text}})
+        return len(text)
+
+    def flush(self):
+        pass
+
+class Server:
+    # JSON-RPC over lines with solvers loaded and parsed models cached
+    CACHE_SIZE = 8
+
+    # flags that change parsed models
+    MODEL_FLAGS = ['propagate', 'linear_expressions', 'dependency_order', 'dynamic_reorder', 'substitute',
+        'array', 'recursive_array', 'array_policy', 'read_over_write', 'lookup_tables', 'ternary', 'sweep', 'sweep_timeout', 'obligations']
+
+    def __init__(self, parser, responses):
+        self.parser = parser
+        self.responses = responses
+        # least recently used parsed models first
+        self.models = collections.OrderedDict()
+
+    def respond(self, response):
+        print(json.dumps({"jsonrpc": "2.0", **response}), file=self.responses, flush=True)
+
+    def check(self, request_id, params):
+        global last_message_length
+        last_message_length = 0
+
+        args = self.parser.parse_args(params.get('args', []))
+        check_arguments(self.parser, args)
+        configure(args)
+
+        model_name = params['model']
+        with open(model_name, 'rb') as modelfile:
+            digest = hashlib.sha256(modelfile.read()).hexdigest()
+        key = (model_name, digest, *[repr(vars(args)[flag]) for flag in Server.MODEL_FLAGS])
+
+        output = Server_Output(self, request_id)
+        with contextlib.redirect_stdout(output):
+            is_cached = key in self.models
+            if is_cached:
+                self.models.move_to_end(key)
+                model, profile, are_there_state_transitions = self.models[key]
+                # replay output of parser
+                print(profile, end='')
+            else:
+                model = Model()
+                with model, open(model_name, 'r') as modelfile:
+                    are_there_state_transitions = parse_model(modelfile, None, args)
+                profile = ''.join(output.text)
+                self.models[key] = model, profile, are_there_state_transitions
+                if len(self.models) > Server.CACHE_SIZE:
+                    self.models.popitem(last=False)
+            try:
+                with model:
+                    check_parsed_model(are_there_state_transitions, args)
+            except BaseException:
+                # failed checks may leave cached models in any state
+                self.models.pop(key, None)
+                raise
+
+        return {"cached": is_cached}
+
+    def serve(self, requests):
+        for line in requests:
+            if not line.strip():
+                continue
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get('id')
+                if request.get('method') == 'check':
+                    self.respond({"id": request_id, "result": self.check(request_id, request.get('params', {}))})
+                elif request.get('method') == 'shutdown':
+                    self.respond({"id": request_id, "result": None})
+                    return False
+                else:
+                    self.respond({"id": request_id, "error": {"code": -32601, "message": "method not found"}})
+            except SystemExit as exit_code:
+                self.respond({"id": request_id, "error": {"code": -32000, "message": f"exited with {exit_code.code}"}})
+            except Exception as message:
+                # including parser assertions and solver exceptions
+                self.respond({"id": request_id, "error": {"code": -32000, "message": f"{type(message).__name__}: {message}"}})
+        return True
+
+def serve(parser, socket_path):
+    if socket_path is None:
+        # exit() on model errors closes sys.stdin but not another file object on its descriptor
+        with open(sys.stdin.fileno(), 'r', closefd=False) as requests:
+            Server(parser, sys.stdout).serve(requests)
+        return
+    server = Server(parser, None)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server_socket:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server_socket.bind(socket_path)
+        server_socket.listen()
+        is_serving = True
+        while is_serving:
+            connection, _ = server_socket.accept()
+            with connection, connection.makefile('r') as requests, connection.makefile('w') as responses:
+                server.responses = responses
+                try:
+                    is_serving = server.serve(requests)
+                except OSError:
+                    # client disconnected
+                    pass
+    os.unlink(socket_path)
+
+import argparse
+
+def new_parser():
     parser = argparse.ArgumentParser(prog='bitme',
         description="bitme is a bounded model checker for BTOR2 models, see github.com/cksystemsteaching/selfie for more details.",
         epilog="bitme is designed to work with BTOR2 models generated by rotor for modeling RISC-V machines and RISC-V code.")
 
-    parser.add_argument('modelfile', type=argparse.FileType('r'))
+    parser.add_argument('modelfile', nargs='?', type=argparse.FileType('r'))
     parser.add_argument('outputfile', nargs='?', type=argparse.FileType('w', encoding='UTF-8'))
 
+    parser.add_argument('-models', nargs='+', type=str) # check each model in its own model context
+
+    parser.add_argument('-jobs', nargs=1, type=int) # check models in parallel worker processes, 0 for all CPUs
+    parser.add_argument('-timeout', nargs=1, type=float) # seconds per model in worker process
+    parser.add_argument('-memory', nargs=1, type=int) # megabytes of address space per model in worker process
+    parser.add_argument('-summary', nargs=1, type=str) # JSON summary of checked models, or CSV if .csv
+
+    parser.add_argument('--autotune', action='store_true') # probe candidate configurations before checking
+    parser.add_argument('-probe-steps', nargs=1, type=int) # steps checked by each probe
+    parser.add_argument('-probe-timeout', nargs=1, type=float) # seconds per probe
+    parser.add_argument('-tuning', nargs=1, type=str) # JSON file of autotuning decisions per model hash
+
+    parser.add_argument('-benchmark', nargs=1, type=str) # periscope JSON file of benchmark results
+    parser.add_argument('-warmups', nargs=1, type=int) # unmeasured benchmark runs
+    parser.add_argument('-repetitions', nargs=1, type=int) # measured benchmark runs
+
+    parser.add_argument('--serve', action='store_true') # check requests on stdin, or on socket
+    parser.add_argument('-socket', nargs=1, type=str) # Unix domain socket of server
+    parser.add_argument('-model-cache', nargs=1, type=int) # number of parsed models cached by server
+
+    parser.add_argument('-binary', nargs=1, type=str) # generate rotor model of RISC-V ELF binary
+    parser.add_argument('-cores', nargs=1, type=int) # number of cores in generated model
+    parser.add_argument('-emit', nargs=1, type=str) # BTOR2 file of generated model, gzip-compressed if .gz
+    parser.add_argument('--prune-decoder', action='store_true') # only instructions in loaded code
+    parser.add_argument('-prelude-cache', nargs=1, type=str) # directory of cached preludes
+
     parser.add_argument('--use-Z3', action='store_true')
     parser.add_argument('--use-bitwuzla', action='store_true')
 
     parser.add_argument('-propagate', nargs=1, type=int)
+    parser.add_argument('--linear-expressions', action='store_true')
+    parser.add_argument('--dependency-order', action='store_true')
+    parser.add_argument('--dynamic-reorder', action='store_true')
     parser.add_argument('--substitute', action='store_true')
 
     parser.add_argument('-array', nargs=1, type=int)
     parser.add_argument('--recursive-array', action='store_true')
+    parser.add_argument('--array-policy', action='store_true')
+    parser.add_argument('--read-over-write', action='store_true')
+    parser.add_argument('--lookup-tables', action='store_true')
+
+    parser.add_argument('-ternary', nargs=1, type=int) # substitute state bits found constant by ternary simulation of k steps
+    parser.add_argument('--sweep', action='store_true') # merge equivalent expressions confirmed by Z3
+    parser.add_argument('-sweep-timeout', nargs=1, type=int) # milliseconds per sweeping query
 
     parser.add_argument('-kmin', nargs=1, type=int)
     parser.add_argument('-kmax', nargs=1, type=int)
@@ -5919,37 +8952,119 @@ def main():
     parser.add_argument('--print-pc', action='store_true') # only for rotor models
     parser.add_argument('--check-termination', action='store_true')
     parser.add_argument('--unconstraining-bad', action='store_true')
+    parser.add_argument('--stop-at-first-bad', action='store_true') # terminate at first counterexample
+    parser.add_argument('--retire-bads', action='store_true') # stop checking bad properties after first counterexample
+    parser.add_argument('--stop-when-retired', action='store_true') # retire bad properties and terminate when all are retired
     parser.add_argument('--print-transition', action='store_true')
     parser.add_argument('--branching', action='store_true') # only for rotor models
+    parser.add_argument('--localize', action='store_true') # check bad properties on refined localization abstractions
+    parser.add_argument('-obligations', nargs=1, type=str) # JSON file of unsat bad properties per model hash and step
+    parser.add_argument('--minimize-witness', action='store_true') # only print inputs needed to reach bad properties
+    parser.add_argument('-enumerate', nargs=1, type=str) # JSON lines file of all inputs reaching bad properties
+
+    return parser
 
-    args = parser.parse_args()
+def check_arguments(parser, args):
+    if args.sweep and not is_Z3_present:
+        parser.error("--sweep requires Z3 for confirming merges")
 
+def configure(args):
     Instance.PROPAGATE = args.propagate[0] if args.propagate and args.propagate[0] >= 0 else None
     Instance.LAMBDAS = not args.substitute
 
+    BVDD.LINEAR_EXPRESSIONS = args.linear_expressions
+    BVDD.DYNAMIC_REORDER = args.dynamic_reorder
+
+    Array.ARRAY_POLICY = args.array_policy
     Array.ARRAY_SIZE_BOUND = args.array[0] if args.array else 0
+    Array.DERIVE_SIZE_BOUND = args.array_policy and not args.array
     Read.READ_ARRAY_ITERATIVELY = not args.recursive_array
+    Read.READ_OVER_WRITE = args.read_over_write
+    Lookup.LOOKUP_TABLES = args.lookup_tables
 
-    are_there_state_transitions = parse_btor2(args.modelfile, args.outputfile)
+    Ternary_Simulation.STEPS = args.ternary[0] if args.ternary and args.ternary[0] >= 0 else None
 
-    if args.kmin or args.kmax:
-        kmin = args.kmin[0] if args.kmin else 0
-        kmax = args.kmax[0] if args.kmax else 0
+    Localization.LOCALIZE = args.localize
 
-        if are_there_state_transitions:
-            kmax = max(kmin, kmax)
-        else:
-            kmin = kmax = 0
+    Obligations.OBLIGATIONS_FILE = args.obligations[0] if args.obligations else None
 
-        if is_Z3_present and args.use_Z3:
-            solver = Z3_Solver()
-            bmc(solver, kmin, kmax, args)
+    Witness.MINIMIZE = args.minimize_witness
 
-        if is_bitwuzla_present and args.use_bitwuzla:
-            solver = Bitwuzla_Solver()
-            bmc(solver, kmin, kmax, args)
+    Enumeration.ENUMERATION_FILE = args.enumerate[0] if args.enumerate else None
 
-    print_separator('#')
+    Sweep.SWEEP = args.sweep and is_Z3_present
+    Sweep.TIMEOUT = args.sweep_timeout[0] if args.sweep_timeout and args.sweep_timeout[0] > 0 else Sweep.TIMEOUT
+
+def main():
+    modelfile, argv = try_rotor()
+
+    parser = new_parser()
+
+    args = parser.parse_args(argv)
+
+    check_arguments(parser, args)
+
+    if modelfile is not None:
+        args.modelfile = modelfile
+
+    if args.binary:
+        global LOADEDIDSONLY
+        global PRELUDE_CACHE
+        LOADEDIDSONLY = args.prune_decoder
+        PRELUDE_CACHE = args.prelude_cache[0] if args.prelude_cache else None
+        System.CORES = args.cores[0] if args.cores and args.cores[0] > 0 else 1
+        rotor_model(args.binary[0], model_file = args.emit[0] if args.emit else None)
+        exit(0)
+    elif args.benchmark:
+        Benchmark.WARMUPS = args.warmups[0] if args.warmups and args.warmups[0] >= 0 else Benchmark.WARMUPS
+        Benchmark.REPETITIONS = args.repetitions[0] if args.repetitions and args.repetitions[0] > 0 else Benchmark.REPETITIONS
+        Benchmark.KMAX = args.kmax[0] if args.kmax else Benchmark.KMAX
+        Benchmark.run(parser, list(Batch.get_model_names(args.models or [])), args.benchmark[0])
+        exit(0)
+    elif args.serve:
+        Server.CACHE_SIZE = args.model_cache[0] if args.model_cache and args.model_cache[0] > 0 else Server.CACHE_SIZE
+        serve(parser, args.socket[0] if args.socket else None)
+        exit(0)
+    elif args.modelfile is None and not args.models:
+        parser.error("the following arguments are required: modelfile")
+
+    configure(args)
+
+    if args.autotune:
+        Autotune.PROBE_STEPS = args.probe_steps[0] if args.probe_steps and args.probe_steps[0] >= 0 else Autotune.PROBE_STEPS
+        Autotune.PROBE_TIMEOUT = args.probe_timeout[0] if args.probe_timeout else Autotune.PROBE_TIMEOUT
+        Autotune.TUNING_FILE = args.tuning[0] if args.tuning else None
+
+    if args.modelfile is not None:
+        if args.autotune and (args.kmin or args.kmax):
+            args = Autotune.tune(parser, args.modelfile.name, args)
+            configure(args)
+        check_model(args.modelfile, args.outputfile, args)
+
+    model_names = list(Batch.get_model_names(args.models or []))
+
+    if args.jobs or args.timeout or args.memory or args.summary:
+        Batch.JOBS = args.jobs[0] if args.jobs and args.jobs[0] > 0 else os.cpu_count()
+        Batch.TIMEOUT = args.timeout[0] if args.timeout else None
+        Batch.MEMORY = args.memory[0] if args.memory else None
+        model_args = {}
+        if args.autotune and (args.kmin or args.kmax):
+            # tune each model before forking its worker
+            model_args = {model_name: Autotune.tune(parser, model_name, args) for model_name in model_names}
+        results = Batch(model_names, args, model_args = model_args).run()
+        Batch.print_summary(results)
+        if args.summary:
+            Batch.write_summary(results, args.summary[0])
+        if any(result['outcome'] != "checked" for result in results):
+            exit(1)
+    else:
+        for model_name in model_names:
+            model_args = args
+            if args.autotune and (args.kmin or args.kmax):
+                model_args = Autotune.tune(parser, model_name, args)
+                configure(model_args)
+            with Model(), open(model_name, 'r') as modelfile:
+                check_model(modelfile, None, model_args)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+import unittest
+import sys
+
+sys.argv = ['bitme.py']
+
+import bitme
+
+
+def encode(*instructions, size=4):
+    return b''.join(instruction.to_bytes(size, 'little') for instruction in instructions)
+
+def decode(code):
+    return [ID for _, ID in bitme.get_instruction_IDs(code)]
+
+
+class TestInstructionDecoder(unittest.TestCase):
+
+    def setUp(self):
+        bitme.IS64BITTARGET = True
+        bitme.RVC = True
+
+    def test_valid_instructions(self):
+        self.assertEqual(decode(encode(
+            0x00000073,                        # ecall
+            0x00000033,                        # add
+            (0x20 << 25) | 0x33,               # sub
+            (0x01 << 25) | 0x33,               # mul
+            (0x10 << 26) | (5 << 12) | 0x13,   # srai with shamt[5] = 0
+            (0x10 << 26) | (1 << 25) | (5 << 12) | 0x13, # srai with shamt[5] = 1
+            0x00000067)),                      # jalr
+            [bitme.ID_ECALL, bitme.ID_ADD, bitme.ID_SUB, bitme.ID_MUL,
+                bitme.ID_SRAI, bitme.ID_SRAI, bitme.ID_JALR])
+
+    def test_illegal_instructions(self):
+        self.assertEqual(decode(encode(
+            (0x02 << 25) | 0x33,               # add with reserved funct7
+            (0x7f << 25) | (4 << 12) | 0x33,   # xor with reserved funct7
+            0x34029073,                        # csrrw
+            0x00100073,                        # ebreak
+            (1 << 12) | 0x67,                  # jalr with funct3 = 1
+            (0x3f << 26) | (1 << 12) | 0x13,   # slli with reserved funct6
+            (0x20 << 25) | (1 << 12) | 0x33)), # sll with sub funct7
+            [bitme.ID_UNKNOWN] * 7)
+
+    def test_valid_compressed_instructions(self):
+        self.assertEqual(decode(encode(
+            0x8082,                            # c.jr ra
+            0x852e,                            # c.mv a0, a1
+            0x9502,                            # c.jalr a0
+            0x952e, size=2)),                  # c.add a0, a1
+            [bitme.ID_C_JR, bitme.ID_C_MV, bitme.ID_C_JALR, bitme.ID_C_ADD])
+
+    def test_illegal_compressed_instructions(self):
+        self.assertEqual(decode(encode(
+            0x0000,                            # all-zero parcel
+            0x9002,                            # c.ebreak
+            0x8002, size=2)),                  # c.jr with rs1 = zero
+            [bitme.ID_UNKNOWN] * 3)
+
+    def test_rv64_instructions_on_rv32(self):
+        bitme.IS64BITTARGET = False
+        self.assertEqual(decode(encode(
+            (3 << 12) | 0x03,                  # ld
+            (3 << 12) | 0x23,                  # sd
+            0x0000001b,                        # addiw
+            0x0000003b)),                      # addw
+            [bitme.ID_UNKNOWN] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()